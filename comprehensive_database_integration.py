@@ -29,6 +29,23 @@ from databricks import sql
 
 logger = logging.getLogger(__name__)
 
+# Non-aggregated columns of the full search query, grouped once per entity
+_FULL_SEARCH_GROUP_COLUMNS = (
+    'm.entity_id', 'm.risk_id', 'm.entity_name', 'm.recordDefinitionType',
+    'm.source_item_id', 'm.systemId', 'm.entityDate',
+)
+_DOB_GROUP_COLUMNS = (
+    'dob.date_of_birth_year', 'dob.date_of_birth_month',
+    'dob.date_of_birth_day', 'dob.date_of_birth_circa',
+)
+_BVD_GROUP_COLUMNS = ('bvd.bvdid', 'bvd.entitytype')
+
+# Rendered GROUP BY clause per entity type (only individuals join dob)
+_FULL_SEARCH_GROUP_BY = {
+    'individual': 'GROUP BY ' + ', '.join(_FULL_SEARCH_GROUP_COLUMNS + _DOB_GROUP_COLUMNS + _BVD_GROUP_COLUMNS),
+    'organization': 'GROUP BY ' + ', '.join(_FULL_SEARCH_GROUP_COLUMNS + _BVD_GROUP_COLUMNS),
+}
+
 class ComprehensiveDatabaseIntegration:
     """Complete database integration fixing all identified issues"""
     
@@ -617,8 +634,9 @@ class ComprehensiveDatabaseIntegration:
             dob_join = ""
         
         # Main query with all necessary joins
+        # GROUP BY already yields one row per entity, so no DISTINCT
         query = f"""
-        SELECT DISTINCT
+        SELECT
             m.entity_id,
             m.risk_id,
             m.entity_name,
@@ -842,23 +860,8 @@ class ComprehensiveDatabaseIntegration:
             query += " WHERE " + " AND ".join(where_conditions)
         
         # Group by and order - handle individual vs organization
-        if entity_type == 'individual':
-            group_by_clause = """
-            GROUP BY m.entity_id, m.risk_id, m.entity_name, m.recordDefinitionType, 
-                     m.source_item_id, m.systemId, m.entityDate,
-                     dob.date_of_birth_year, dob.date_of_birth_month, 
-                     dob.date_of_birth_day, dob.date_of_birth_circa,
-                     bvd.bvdid, bvd.entitytype
-            """
-        else:
-            group_by_clause = """
-            GROUP BY m.entity_id, m.risk_id, m.entity_name, m.recordDefinitionType, 
-                     m.source_item_id, m.systemId, m.entityDate,
-                     bvd.bvdid, bvd.entitytype
-            """
-        
         query += f"""
-        {group_by_clause}
+        {_FULL_SEARCH_GROUP_BY.get(entity_type, _FULL_SEARCH_GROUP_BY['organization'])}
         ORDER BY m.entity_name
         LIMIT {search_params.get('limit', 100)}
         """
@@ -4,56 +4,213 @@ Automatically extracts ALL event codes from database and definitions from docume
 User-configurable risk scoring for all codes with no hardcoding
 """
 
+import os
 import re
+import mmap
+import pickle
+import hashlib
 import logging
+import functools
+from bisect import bisect_right
+from pathlib import Path
 from typing import Dict, Any, List, Tuple
 from datetime import datetime
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Source files
+DATA_DIR = "/Users/sujanmukhiya/Desktop/NiceGUI_GRID/advanced_entity_search"
+CODES_FILE = os.path.join(DATA_DIR, "codes.txt")
+RISK_CODES_FILE = os.path.join(DATA_DIR, "risk codes.txt")
+USER_CONFIG_FILE = os.path.join(DATA_DIR, "user_event_config.json")
+
+# Derived state cache, keyed by the modification times of the source files
+STATE_CACHE_DIR = Path.home() / '.cache' / 'grid'
+STATE_CACHE_VERSION = 1  # Bump when the derivation logic changes
+
+# Event code line with usage count (e.g., "ABU 1255581"), surrounding blanks allowed
+_CODE_LINE_PATTERN = re.compile(rb'^[ \t]*([A-Z]{3})[ \t]+(\d+)[ \t\r]*$', re.MULTILINE)
+
+# Severity keyword tiers, highest priority first
+SEVERITY_KEYWORDS = (
+    # High-risk keywords that indicate critical severity
+    ('critical', (
+        'terror', 'trafficking', 'murder', 'laundering', 'weapon', 'sanction', 'watch',
+        'denied', 'espionage', 'kidnap', 'human rights', 'organized crime'
+    )),
+    # Medium-risk keywords
+    ('valuable', (
+        'fraud', 'bribery', 'conspiracy', 'robbery', 'tax', 'securities', 'regulatory',
+        'corruption', 'embezzle', 'extortion'
+    )),
+    # Lower-risk keywords
+    ('investigative', (
+        'assault', 'theft', 'burglary', 'forgery', 'cyber', 'identity', 'counterfeit',
+        'smuggling', 'fugitive'
+    )),
+)
+
+# Severity -> (minimum score, bonus over frequency-based score)
+SEVERITY_SCORE_ADJUSTMENTS = {
+    'critical': (85, 30),
+    'valuable': (65, 20),
+    'investigative': (45, 10),
+}
+
+_SEVERITY_PATTERNS = tuple(
+    (severity, re.compile('|'.join(re.escape(keyword) for keyword in keywords)))
+    for severity, keywords in SEVERITY_KEYWORDS
+)
+
+def _build_severity_automaton():
+    """Build one Aho-Corasick automaton over all tiers; values are (priority, severity)"""
+    automaton = ahocorasick.Automaton()
+    for priority, (severity, keywords) in enumerate(SEVERITY_KEYWORDS):
+        for keyword in keywords:
+            automaton.add_word(keyword, (priority, severity))
+    automaton.make_automaton()
+    return automaton
+
+# Preferred over the regex tiers when pyahocorasick is installed: a single
+# linear pass regardless of how many keywords are configured
+_SEVERITY_AUTOMATON = _build_severity_automaton() if AHOCORASICK_AVAILABLE else None
+
+# Common code patterns: first letter -> category
+CODE_LETTER_CATEGORIES = {
+    'A': 'Assault/Abuse',
+    'B': 'Business/Bribery',
+    'C': 'Conspiracy/Cyber',
+    'D': 'Drug/Denied',
+    'E': 'Environmental/Economic',
+    'F': 'Fraud/Fugitive',
+    'G': 'Government',
+    'H': 'Human Rights/Trafficking',
+    'I': 'Identity/Immigration',
+    'K': 'Kidnapping',
+    'L': 'Legal',
+    'M': 'Money/Murder',
+    'O': 'Organized Crime',
+    'P': 'Political/Possession',
+    'R': 'Regulatory/Robbery',
+    'S': 'Sanctions/Securities',
+    'T': 'Terrorism/Tax/Theft',
+    'W': 'Weapons/Watch List'
+}
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes, using orjson when installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
 class ComprehensiveEventCodes:
     """Comprehensive event codes configuration with auto-extraction and user customization"""
     
+    # Category by first letter of the code, indexed by ord(letter) - ord('A')
+    _CATEGORY_TABLE = tuple(CODE_LETTER_CATEGORIES.get(chr(65 + i), '') for i in range(26))
+    
     def __init__(self):
         """Initialize comprehensive event codes system"""
         self.all_codes = {}
         self.code_definitions = {}
         self.risk_scores = {}
         self.user_customizations = {}
+        self._sorted_codes = None  # Sorted code list, rebuilt lazily after codes are added
+        
+        # Bounded cache for hot lookups; cleared whenever code config changes
+        self._code_info_cache = functools.lru_cache(maxsize=1024)(self._build_code_info)
         
-        # Load all data
-        self._load_database_codes()
-        self._load_code_definitions()
-        self._assign_default_risk_scores()
-        self._load_user_customizations()
+        # Load all data, unless the source files are unchanged since the last run
+        cache_file = self._state_cache_file()
+        if not self._load_cached_state(cache_file):
+            self._load_database_codes()
+            self._load_code_definitions()
+            self._assign_default_risk_scores()
+            self._load_user_customizations()
+            self._save_cached_state(cache_file)
     
-    def _load_database_codes(self):
-        """Load ALL event codes from database query results"""
+    def _state_cache_file(self) -> Path:
+        """Cache file path for the current versions of the source files"""
+        mtimes = []
+        for source_file in (CODES_FILE, RISK_CODES_FILE, USER_CONFIG_FILE):
+            try:
+                mtimes.append(os.stat(source_file).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        
+        key = hashlib.sha1(repr((STATE_CACHE_VERSION, mtimes)).encode('utf-8')).hexdigest()
+        return STATE_CACHE_DIR / f'event_codes_{key}.pkl'
+    
+    def _load_cached_state(self, cache_file: Path) -> bool:
+        """Restore derived tables from the disk cache; returns False on a miss"""
         try:
-            codes_file = "/Users/sujanmukhiya/Desktop/NiceGUI_GRID/advanced_entity_search/codes.txt"
+            with open(cache_file, 'rb') as f:
+                (self.all_codes, self.risk_scores,
+                 self.code_definitions, self.user_customizations) = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable event codes cache {cache_file}: {e}")
+            return False
+        
+        logger.info(f"✅ Loaded {len(self.all_codes)} event codes from cache")
+        return True
+    
+    def _save_cached_state(self, cache_file: Path):
+        """Persist derived tables so the next start can skip re-computation"""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(codes_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Drop caches for older versions of the source files
+            for stale_file in cache_file.parent.glob('event_codes_*.pkl'):
+                if stale_file != cache_file:
+                    stale_file.unlink(missing_ok=True)
             
-            # Extract event codes and usage counts
-            # Pattern: CODE usage_count (e.g., "ABU 1255581")
-            code_pattern = r'^([A-Z]{3})\s+(\d+)$'
+            state = (self.all_codes, self.risk_scores, self.code_definitions, self.user_customizations)
+            with open(cache_file, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write event codes cache {cache_file}: {e}")
+    
+    def _load_database_codes(self):
+        """Load ALL event codes from database query results"""
+        try:
+            codes_file = CODES_FILE
             
-            for line in content.split('\n'):
-                line = line.strip()
-                match = re.match(code_pattern, line)
-                if match:
-                    code = match.group(1)
-                    usage_count = int(match.group(2))
-                    
-                    self.all_codes[code] = {
-                        'usage_count': usage_count,
-                        'frequency_rank': 0,  # Will be calculated later
-                        'category': self._infer_category_from_code(code),
-                        'name': self._get_default_name(code),
-                        'source': 'database_query'
-                    }
+            # Content is plain ASCII, so scan the mapped bytes directly - no decode, no line split
+            with open(codes_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        for match in _CODE_LINE_PATTERN.finditer(mapped):
+                            code = match.group(1).decode('ascii')
+                            usage_count = int(match.group(2))
+                            
+                            self.all_codes[code] = {
+                                'usage_count': usage_count,
+                                'frequency_rank': 0,  # Will be calculated later
+                                'category': self._infer_category_from_code(code),
+                                'name': self._get_default_name(code),
+                                'source': 'database_query'
+                            }
             
             # Calculate frequency ranks
             sorted_codes = sorted(self.all_codes.items(), key=lambda x: x[1]['usage_count'], reverse=True)
@@ -69,7 +226,7 @@ class ComprehensiveEventCodes:
     def _load_code_definitions(self):
         """Load code definitions from risk codes documentation"""
         try:
-            risk_codes_file = "/Users/sujanmukhiya/Desktop/NiceGUI_GRID/advanced_entity_search/risk codes.txt"
+            risk_codes_file = RISK_CODES_FILE
             
             with open(risk_codes_file, 'r', encoding='utf-8') as f:
                 content = f.read()
@@ -103,30 +260,16 @@ class ComprehensiveEventCodes:
     
     def _assign_default_risk_scores(self):
         """Assign default risk scores based on frequency, category, and severity indicators"""
+        codes = list(self.all_codes.keys())
         
-        # High-risk keywords that indicate critical severity
-        critical_keywords = [
-            'terror', 'trafficking', 'murder', 'laundering', 'weapon', 'sanction', 'watch',
-            'denied', 'espionage', 'kidnap', 'human rights', 'organized crime'
-        ]
+        # Scan every code's name/description in one pass per severity tier
+        severity_by_index = self._match_severity_tiers([
+            f"{self.all_codes[code].get('name', '')} {self.all_codes[code].get('description', '')}".lower()
+            for code in codes
+        ])
         
-        # Medium-risk keywords
-        valuable_keywords = [
-            'fraud', 'bribery', 'conspiracy', 'robbery', 'tax', 'securities', 'regulatory',
-            'corruption', 'embezzle', 'extortion'
-        ]
-        
-        # Lower-risk keywords
-        investigative_keywords = [
-            'assault', 'theft', 'burglary', 'forgery', 'cyber', 'identity', 'counterfeit',
-            'smuggling', 'fugitive'
-        ]
-        
-        for code, data in self.all_codes.items():
-            # Get name and description for analysis
-            name = data.get('name', '').lower()
-            description = data.get('description', '').lower()
-            text_to_analyze = f"{name} {description}"
+        for index, code in enumerate(codes):
+            data = self.all_codes[code]
             
             # Default risk score based on frequency (more frequent = potentially lower individual risk)
             frequency_rank = data.get('frequency_rank', 50)
@@ -134,22 +277,11 @@ class ComprehensiveEventCodes:
             
             # Adjust based on severity indicators
             risk_score = base_score
-            severity = 'probative'
+            severity = severity_by_index.get(index, 'probative')
             
-            # Check for critical indicators
-            if any(keyword in text_to_analyze for keyword in critical_keywords):
-                risk_score = max(85, base_score + 30)
-                severity = 'critical'
-            
-            # Check for valuable indicators
-            elif any(keyword in text_to_analyze for keyword in valuable_keywords):
-                risk_score = max(65, base_score + 20)
-                severity = 'valuable'
-            
-            # Check for investigative indicators
-            elif any(keyword in text_to_analyze for keyword in investigative_keywords):
-                risk_score = max(45, base_score + 10)
-                severity = 'investigative'
+            if severity in SEVERITY_SCORE_ADJUSTMENTS:
+                floor, bonus = SEVERITY_SCORE_ADJUSTMENTS[severity]
+                risk_score = max(floor, base_score + bonus)
             
             # Ensure score is within bounds
             risk_score = min(100, max(10, risk_score))
@@ -163,32 +295,49 @@ class ComprehensiveEventCodes:
         
         logger.info(f"✅ Assigned default risk scores for {len(self.risk_scores)} codes")
     
+    def _match_severity_tiers(self, texts: List[str]) -> Dict[int, str]:
+        """Map text index -> highest matching severity tier.
+        
+        All texts are joined into a single NUL-separated buffer so each tier
+        pattern walks the data once, instead of once per code per keyword.
+        Hits are bucketed back to their text by offset.
+        """
+        if not texts:
+            return {}
+        
+        buffer = '\x00'.join(texts)
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        
+        severity_by_index = {}
+        
+        if _SEVERITY_AUTOMATON is not None:
+            # Automaton reports (end offset, value) for every hit; keep the best tier per text
+            best_priority = {}
+            for end, (priority, severity) in _SEVERITY_AUTOMATON.iter(buffer):
+                index = bisect_right(starts, end) - 1
+                if priority < best_priority.get(index, len(SEVERITY_KEYWORDS)):
+                    best_priority[index] = priority
+                    severity_by_index[index] = severity
+            return severity_by_index
+        
+        # Tiers are ordered by priority, so a code keeps its first (highest) match
+        for severity, pattern in _SEVERITY_PATTERNS:
+            for match in pattern.finditer(buffer):
+                index = bisect_right(starts, match.start()) - 1
+                severity_by_index.setdefault(index, severity)
+        
+        return severity_by_index
+    
     def _infer_category_from_code(self, code: str) -> str:
         """Infer category from 3-letter code patterns"""
-        # Common code patterns
-        patterns = {
-            'A': 'Assault/Abuse',
-            'B': 'Business/Bribery', 
-            'C': 'Conspiracy/Cyber',
-            'D': 'Drug/Denied',
-            'E': 'Environmental/Economic',
-            'F': 'Fraud/Fugitive',
-            'G': 'Government',
-            'H': 'Human Rights/Trafficking',
-            'I': 'Identity/Immigration',
-            'K': 'Kidnapping',
-            'L': 'Legal',
-            'M': 'Money/Murder',
-            'O': 'Organized Crime',
-            'P': 'Political/Possession',
-            'R': 'Regulatory/Robbery',
-            'S': 'Sanctions/Securities',
-            'T': 'Terrorism/Tax/Theft',
-            'W': 'Weapons/Watch List'
-        }
-        
-        first_letter = code[0] if code else 'U'
-        return patterns.get(first_letter, 'Unknown Category')
+        index = ord(code[0]) - 65 if code else -1
+        if 0 <= index < 26:
+            return self._CATEGORY_TABLE[index] or 'Unknown Category'
+        return 'Unknown Category'
     
     def _get_default_name(self, code: str) -> str:
         """Get default name for unknown codes"""
@@ -216,10 +365,10 @@ class ComprehensiveEventCodes:
     def _load_user_customizations(self):
         """Load user customizations from config file"""
         try:
-            config_file = "/Users/sujanmukhiya/Desktop/NiceGUI_GRID/advanced_entity_search/user_event_config.json"
+            config_file = USER_CONFIG_FILE
             
-            with open(config_file, 'r', encoding='utf-8') as f:
-                self.user_customizations = json.load(f)
+            with open(config_file, 'rb') as f:
+                self.user_customizations = _json_loads(f.read())
             
             # Apply user customizations
             for code, custom_config in self.user_customizations.items():
@@ -238,7 +387,7 @@ class ComprehensiveEventCodes:
     def save_user_customizations(self):
         """Save user customizations to config file"""
         try:
-            config_file = "/Users/sujanmukhiya/Desktop/NiceGUI_GRID/advanced_entity_search/user_event_config.json"
+            config_file = USER_CONFIG_FILE
             
             # Extract only user-customized codes
             user_configs = {
@@ -246,8 +395,8 @@ class ComprehensiveEventCodes:
                 if config.get('user_customized', False)
             }
             
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(user_configs, f, indent=2, ensure_ascii=False)
+            with open(config_file, 'wb') as f:
+                f.write(_json_dumps(user_configs))
             
             logger.info(f"✅ Saved user customizations for {len(user_configs)} codes")
             
@@ -255,7 +404,18 @@ class ComprehensiveEventCodes:
             logger.error(f"❌ Error saving user customizations: {e}")
     
     def get_code_info(self, code: str) -> Dict[str, Any]:
-        """Get comprehensive information about an event code"""
+        """Get comprehensive information about an event code
+        
+        Results are cached per code; treat the returned dict as read-only.
+        """
+        return self._code_info_cache(code)
+    
+    def clear_code_info_cache(self):
+        """Drop cached code info after any change to codes or risk scores"""
+        self._code_info_cache.cache_clear()
+    
+    def _build_code_info(self, code: str) -> Dict[str, Any]:
+        """Build the information dict for an event code"""
         if code not in self.all_codes:
             return {
                 'code': code,
@@ -299,6 +459,7 @@ class ComprehensiveEventCodes:
                 'name': name or f'User Defined {code}',
                 'source': 'user_added'
             }
+            self._sorted_codes = None
         
         if code not in self.risk_scores:
             self.risk_scores[code] = {}
@@ -316,24 +477,33 @@ class ComprehensiveEventCodes:
         # Mark as user customized
         self.risk_scores[code]['user_customized'] = True
         self.risk_scores[code]['auto_assigned'] = False
+        self.clear_code_info_cache()
         
         logger.info(f"✅ Updated configuration for code {code}")
     
     def get_all_codes_summary(self) -> List[Dict[str, Any]]:
         """Get summary of all codes for UI display"""
+        if self._sorted_codes is None:
+            self._sorted_codes = sorted(self.all_codes)
+        
+        all_codes = self.all_codes
+        risk_scores = self.risk_scores
+        empty = {}
         summary = []
         
-        for code in sorted(self.all_codes.keys()):
-            info = self.get_code_info(code)
+        for code in self._sorted_codes:
+            base_info = all_codes[code]
+            risk_info = risk_scores.get(code, empty)
+            description = base_info.get('description', 'No description available')
             summary.append({
                 'code': code,
-                'name': info['name'],
-                'risk_score': info['risk_score'],
-                'severity': info['severity'],
-                'usage_count': info['usage_count'],
-                'frequency_rank': info['frequency_rank'],
-                'user_customized': info['user_customized'],
-                'description': info['description'][:100] + '...' if len(info['description']) > 100 else info['description']
+                'name': base_info.get('name', f'Event Code {code}'),
+                'risk_score': risk_info.get('risk_score', 0),
+                'severity': risk_info.get('severity', 'unknown'),
+                'usage_count': base_info.get('usage_count', 0),
+                'frequency_rank': base_info.get('frequency_rank', 999),
+                'user_customized': risk_info.get('user_customized', False),
+                'description': description[:100] + '...' if len(description) > 100 else description
             })
         
         return summary
@@ -357,10 +527,12 @@ class ComprehensiveEventCodes:
         try:
             if 'all_codes' in config:
                 self.all_codes.update(config['all_codes'])
+                self._sorted_codes = None
             if 'risk_scores' in config:
                 self.risk_scores.update(config['risk_scores'])
             if 'code_definitions' in config:
                 self.code_definitions.update(config['code_definitions'])
+            self.clear_code_info_cache()
             
             logger.info("✅ Configuration imported successfully")
             
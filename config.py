@@ -4,15 +4,24 @@ Centralizes all hardcoded values for production readiness
 """
 import json
 import os
+import functools
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 class ConfigManager:
     """Centralized configuration management"""
     
     def __init__(self, config_file: Optional[str] = None):
         self.config_file = config_file or 'config.json'
         self.config = self._load_config()
+        # Bounded cache for hot dot-notation lookups; cleared by set()
+        self._cached_get = functools.lru_cache(maxsize=256, typed=True)(self._raw_get)
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file or use defaults"""
@@ -20,8 +29,9 @@ class ConfigManager:
         
         if config_path.exists():
             try:
-                with open(config_path, 'r') as f:
-                    return json.load(f)
+                with open(config_path, 'rb') as f:
+                    data = f.read()
+                return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
             except Exception as e:
                 print(f"Warning: Could not load config file {self.config_file}: {e}")
         
@@ -154,6 +164,14 @@ class ConfigManager:
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value using dot notation"""
+        try:
+            return self._cached_get(key, default)
+        except TypeError:
+            # Unhashable default (e.g. a dict) - resolve without caching
+            return self._raw_get(key, default)
+    
+    def _raw_get(self, key: str, default: Any = None) -> Any:
+        """Resolve a dot-notation key against the current configuration"""
         keys = key.split('.')
         value = self.config
         
@@ -175,12 +193,17 @@ class ConfigManager:
             config = config[k]
         
         config[keys[-1]] = value
+        self._cached_get.cache_clear()
     
     def save_config(self) -> None:
         """Save current configuration to file"""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            if ORJSON_AVAILABLE:
+                with open(self.config_file, 'wb') as f:
+                    f.write(orjson.dumps(self.config, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.config_file, 'w') as f:
+                    json.dump(self.config, f, indent=2)
         except Exception as e:
             print(f"Error saving config: {e}")
     
@@ -2,22 +2,90 @@
 Configuration UI Module
 Provides web-based interface for editing all application configurations
 """
+import asyncio
+import copy
 from nicegui import ui
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import json
 from database_verified_config import database_verified_config
 
+W_FULL = 'w-full'
+
+
+def _as_str(value: Any) -> str:
+    """str() only for values that are not already strings"""
+    return value if type(value) is str else str(value)
+
+
+def _text_input(value: str = '', label: str = '') -> ui.input:
+    """Full-width text input"""
+    return ui.input(label, value=value).classes(W_FULL)
+
+
 class ConfigurationUI:
     """Web-based configuration editor"""
     
+    # Sidebar entries: (section key, title, description)
+    _SECTIONS = (
+        ("event_categories", "Event Categories", "Risk event types and scores"),
+        ("event_sub_categories", "Event Sub-Categories", "Event modifiers and multipliers"),
+        ("pep_types", "PEP Types", "Politically Exposed Person classifications"),
+        ("entity_attributes", "Entity Attributes", "Database attribute definitions"),
+        ("relationship_types", "Relationship Types", "Entity relationship classifications"),
+        ("geographic_risk", "Geographic Risk", "Country-specific risk factors"),
+        ("risk_thresholds", "Risk Thresholds", "Risk scoring boundaries"),
+        ("system_settings", "System Settings", "Performance and system configuration"),
+        ("ui_settings", "UI Settings", "User interface configuration"),
+        ("database", "Database Settings", "Database connection settings"),
+        ("server", "Server Settings", "Server configuration")
+    )
+    
+    # Table headers for the code dictionary sections
+    _SECTION_HEADERS = {
+        "event_categories": ["Code", "Name", "Description", "Risk Score", "Severity", "Actions"],
+        "event_sub_categories": ["Code", "Name", "Description", "Multiplier", "Actions"],
+        "pep_types": ["Code", "Name", "Description", "Risk Multiplier", "Level", "Actions"],
+        "entity_attributes": ["Code", "Name", "Description", "Data Type", "Actions"],
+        "relationship_types": ["Code", "Name", "Description", "Risk Factor", "Actions"]
+    }
+    _DEFAULT_HEADERS = ["Code", "Name", "Description", "Actions"]
+    
+    # Headers edited as numbers rather than text
+    _NUMERIC_HEADERS = frozenset({"Risk Score", "Multiplier", "Risk Multiplier", "Risk Factor"})
+    
+    # Fixed instance layout; every attribute set in __init__ must be listed here
+    __slots__ = (
+        'config', 'current_section', 'search_filter', '_needle',
+        '_title_label', '_section_cards', '_content_container', '_dirty',
+        '_geo_panels', '_geo_rendered', '_country_tables', '_threshold_models', '_threshold_canvas_id',
+        '_section_cache', '_row_cache', '_data_table', '_data_table_fields',
+        '_rendered_section', '_last_render_signature'
+    )
+    
     def __init__(self):
         self.config = database_verified_config
         self.current_section = "event_categories"
         self.search_filter = ""
+        self._needle = ""  # search_filter, case-folded once per search
+        self._title_label = None
+        self._section_cards = {}  # Sidebar cards by section key
+        self._content_container = None  # Only part of the editor rebuilt on refresh
+        self._dirty: Dict[Tuple[str, ...], Any] = {}  # Unsaved edits by config path, applied on Save All
+        self._geo_panels = {}  # Geographic risk tab panels by level
+        self._geo_rendered = set()  # Levels whose panel has been built
+        self._country_tables = {}  # Country risk tables by level, for in-place row updates
+        self._threshold_models = {}  # Per-level dicts the threshold widgets are bound to
+        self._threshold_canvas_id = None  # DOM id of the canvas holding the threshold color bands
+        self._section_cache: Dict[str, Dict] = {}  # Section dicts fetched from config, dropped on writes
+        self._row_cache: Dict[str, Dict[str, Tuple[Dict, str]]] = {}  # Section -> code -> (row, search text)
+        self._data_table = None  # Code dictionary table of the current render, if any
+        self._rendered_section = None  # Section currently shown in the content container
+        self._last_render_signature: Dict[str, int] = {}  # General settings section -> content hash when rendered
+        self._data_table_fields: List[Tuple[str, bool]] = []
         
     def render_config_interface(self):
         """Render the main configuration interface"""
-        with ui.card().classes('w-full'):
+        with ui.card().classes(W_FULL):
             ui.label('System Configuration Management').classes('text-2xl font-bold mb-4')
             
             with ui.row().classes('w-full gap-4'):
@@ -33,56 +101,67 @@ class ConfigurationUI:
         """Render configuration sections sidebar"""
         ui.label('Configuration Sections').classes('text-lg font-semibold mb-3')
         
-        sections = [
-            ("event_categories", "Event Categories", "Risk event types and scores"),
-            ("event_sub_categories", "Event Sub-Categories", "Event modifiers and multipliers"),
-            ("pep_types", "PEP Types", "Politically Exposed Person classifications"),
-            ("entity_attributes", "Entity Attributes", "Database attribute definitions"),
-            ("relationship_types", "Relationship Types", "Entity relationship classifications"),
-            ("geographic_risk", "Geographic Risk", "Country-specific risk factors"),
-            ("risk_thresholds", "Risk Thresholds", "Risk scoring boundaries"),
-            ("system_settings", "System Settings", "Performance and system configuration"),
-            ("ui_settings", "UI Settings", "User interface configuration"),
-            ("database", "Database Settings", "Database connection settings"),
-            ("server", "Server Settings", "Server configuration")
-        ]
-        
-        for section_key, title, description in sections:
-            with ui.card().classes('mb-2 cursor-pointer hover:bg-gray-100').on('click', 
-                lambda s=section_key: self._select_section(s)):
+        self._section_cards = {}
+        for section_key, title, description in self._SECTIONS:
+            with ui.card().classes('mb-2 cursor-pointer hover:bg-gray-100') as card:
                 ui.label(title).classes('font-medium')
                 ui.label(description).classes('text-sm text-gray-600')
+            
+            # One shared handler; the card carries its own section key
+            card._section = section_key
+            card.on('click', self._on_section_click)
+            self._section_cards[section_key] = card
+        
+        self._mark_active_section()
+    
+    def _on_section_click(self, e):
+        """Shared click handler for sidebar section cards"""
+        self._select_section(e.sender._section)
+    
+    def _mark_active_section(self):
+        """Highlight the current section's card without rebuilding the sidebar"""
+        for section_key, card in self._section_cards.items():
+            if section_key == self.current_section:
+                card.classes(add='bg-blue-100')
+            else:
+                card.classes(remove='bg-blue-100')
     
     def _select_section(self, section: str):
         """Select configuration section"""
         self.current_section = section
+        self._mark_active_section()
         self._refresh_editor()
     
     def _render_config_editor(self):
         """Render the configuration editor for current section"""
-        container = ui.column().classes('w-full')
-        
-        with container:
-            # Header with search
+        with ui.column().classes(W_FULL):
+            # Header with search - built once and kept across refreshes
             with ui.row().classes('w-full items-center mb-4'):
-                ui.label(f'Configure {self.current_section.replace("_", " ").title()}').classes('text-xl font-semibold')
+                self._title_label = ui.label(self._editor_title()).classes('text-xl font-semibold')
                 ui.space()
-                with ui.input('Search...').classes('w-64') as search_input:
-                    search_input.on('input', lambda e: self._filter_configs(e.value))
+                # Quasar debounces the model update, so filtering runs once typing pauses
+                ui.input('Search...', on_change=lambda e: self._filter_configs(e.value)) \
+                    .classes('w-64').props('debounce=150')
                 
                 ui.button('Add New', on_click=self._add_new_config).props('color=primary')
                 ui.button('Save All', on_click=self._save_all_configs).props('color=positive')
                 ui.button('Reset', on_click=self._reset_configs).props('color=negative')
             
             # Configuration content
-            self._render_section_content(container)
+            self._content_container = ui.column().classes(W_FULL)
+            self._render_section_content(self._content_container)
+    
+    def _editor_title(self) -> str:
+        """Editor heading for the current section"""
+        return f'Configure {self.current_section.replace("_", " ").title()}'
     
     def _render_section_content(self, container):
         """Render content for the selected section"""
-        section_data = self.config.get(self.current_section, {})
+        section_data = self._with_pending_edits((self.current_section,),
+                                                self._section(self.current_section))
+        self._rendered_section = self.current_section
         
-        if self.current_section in ["event_categories", "event_sub_categories", "pep_types", 
-                                    "entity_attributes", "relationship_types"]:
+        if self.current_section in self._SECTION_HEADERS:
             self._render_code_dictionary_section(container, section_data)
         elif self.current_section == "geographic_risk":
             self._render_geographic_risk_section(container, section_data)
@@ -94,75 +173,101 @@ class ConfigurationUI:
     def _render_code_dictionary_section(self, container, data: Dict):
         """Render code dictionary sections (event categories, PEP types, etc.)"""
         with container:
-            # Create table headers based on section type
-            if self.current_section == "event_categories":
-                headers = ["Code", "Name", "Description", "Risk Score", "Severity", "Actions"]
-            elif self.current_section == "event_sub_categories":
-                headers = ["Code", "Name", "Description", "Multiplier", "Actions"]
-            elif self.current_section == "pep_types":
-                headers = ["Code", "Name", "Description", "Risk Multiplier", "Level", "Actions"]
-            elif self.current_section == "entity_attributes":
-                headers = ["Code", "Name", "Description", "Data Type", "Actions"]
-            elif self.current_section == "relationship_types":
-                headers = ["Code", "Name", "Description", "Risk Factor", "Actions"]
-            else:
-                headers = ["Code", "Name", "Description", "Actions"]
+            headers = self._SECTION_HEADERS.get(self.current_section, self._DEFAULT_HEADERS)
             
             # Create data table
-            with ui.card().classes('w-full'):
+            with ui.card().classes(W_FULL):
                 self._create_data_table(data, headers)
     
     def _create_data_table(self, data: Dict, headers: List[str]):
         """Create an editable data table"""
-        table_data = []
+        fields = [(header.lower().replace(' ', '_'),
+                   header in self._NUMERIC_HEADERS)
+                  for header in headers[1:-1]]  # Skip Code and Actions
         
-        for code, info in data.items():
-            if isinstance(info, dict):
-                row = {"code": code}
-                row.update(info)
-                table_data.append(row)
+        # Editable cells emit one table-level event instead of one handler per widget
+        actions = [('edit_row', 'Edit', 'primary'), ('delete_row', 'Delete', 'negative')]
         
-        # Filter data if search is active
-        if self.search_filter:
-            table_data = [row for row in table_data 
-                         if self.search_filter.lower() in str(row).lower()]
+        table = self._create_editable_table(headers, fields, actions, self._visible_rows(data, fields))
+        table.on('cell_change', lambda e: self._update((self.current_section, e.args['code'], e.args['field']),
+                                                       e.args['value']))
+        table.on('edit_row', lambda e: self._edit_config_item(e.args))
+        table.on('delete_row', lambda e: self._delete_config_item(e.args))
         
-        # Create table
-        with ui.grid(columns=len(headers)).classes('w-full gap-2'):
-            # Headers
-            for header in headers:
-                ui.label(header).classes('font-bold text-center p-2 bg-gray-100')
-            
-            # Data rows
-            for row in table_data:
-                self._render_table_row(row, headers)
+        # Kept so searches and deletes can swap rows without rebuilding columns/headers
+        self._data_table = table
+        self._data_table_fields = fields
     
-    def _render_table_row(self, row: Dict, headers: List[str]):
-        """Render a single table row with editable fields"""
-        code = row.get('code', '')
+    def _visible_rows(self, data: Dict, fields: List[Tuple[str, bool]]) -> List[Dict]:
+        """Cached rows of the current section that match the search filter"""
+        rows = self._row_cache.get(self.current_section)
+        if rows is None:
+            numeric_fields = [field_key for field_key, is_numeric in fields if is_numeric]
+            rows = {}
+            for code, info in data.items():
+                if isinstance(info, dict):
+                    row = {"code": code}
+                    row.update(info)
+                    # Coerce numeric columns once here rather than on every render
+                    for field_key in numeric_fields:
+                        row[field_key] = float(row.get(field_key) or 0.0)
+                    rows[code] = (row, self._search_text(row))
+            self._row_cache[self.current_section] = rows
         
-        # Code (non-editable)
-        ui.label(code).classes('p-2 text-center')
+        # Filter data if search is active - match against the prebuilt search text
+        if self._needle:
+            return [row for row, search_text in rows.values() if self._needle in search_text]
+        return [row for row, _ in rows.values()]
+    
+    def _refresh_table_body(self):
+        """Replace the data table's rows in place, keeping the table and its headers"""
+        if self._data_table is None:
+            self._refresh_editor()
+            return
+        data = self._with_pending_edits((self.current_section,), self._section(self.current_section))
+        self._data_table.rows[:] = self._visible_rows(data, self._data_table_fields)
+        self._data_table.update()
+    
+    @staticmethod
+    def _search_text(row: Dict) -> str:
+        """Case-folded haystack of a row's values for search filtering"""
+        return ' '.join(map(str, row.values())).casefold()
+    
+    def _create_editable_table(self, headers: List[str], fields: List[Tuple[str, bool]],
+                               actions: List[Tuple[str, str, str]], rows: List[Dict]):
+        """Create a virtual-scrolling table whose cells are edited in place
         
-        # Editable fields based on headers
-        for header in headers[1:-1]:  # Skip Code and Actions
-            field_key = header.lower().replace(' ', '_')
-            value = row.get(field_key, '')
-            
-            if header in ["Risk Score", "Multiplier", "Risk Multiplier", "Risk Factor"]:
-                # Numeric input
-                input_elem = ui.number(value=float(value) if value else 0, step=0.1, 
-                                     format='%.2f').classes('w-full')
-                input_elem.on('change', lambda e, c=code, k=field_key: self._update_config_value(c, k, e.value))
-            else:
-                # Text input
-                input_elem = ui.input(value=str(value)).classes('w-full')
-                input_elem.on('change', lambda e, c=code, k=field_key: self._update_config_value(c, k, e.value))
+        fields lists (field_key, is_numeric) for the editable columns between
+        Code and Actions. Edits emit 'cell_change' with {code, field, value};
+        each action button emits its event name with the row code.
+        """
+        keys = ['code'] + [field_key for field_key, _ in fields] + ['actions']
+        columns = [{'name': key, 'label': header, 'field': key, 'align': 'left'}
+                   for key, header in zip(keys, headers)]
         
-        # Actions
-        with ui.row().classes('gap-1'):
-            ui.button('Edit', on_click=lambda c=code: self._edit_config_item(c)).props('size=sm color=primary')
-            ui.button('Delete', on_click=lambda c=code: self._delete_config_item(c)).props('size=sm color=negative')
+        cells = ['<q-td key="code" :props="props">{{ props.row.code }}</q-td>']
+        for field_key, is_numeric in fields:
+            model = f'v-model.number="props.row.{field_key}" type="number" step="0.1"' if is_numeric \
+                else f'v-model="props.row.{field_key}"'
+            cells.append(
+                f'<q-td key="{field_key}" :props="props">'
+                f'<q-input {model} dense '
+                f'@change="() => $parent.$emit(\'cell_change\', '
+                f'{{code: props.row.code, field: \'{field_key}\', value: props.row.{field_key}}})" />'
+                f'</q-td>'
+            )
+        buttons = ''.join(
+            f'<q-btn size="sm" color="{color}" label="{label}" class="q-mr-xs" '
+            f'@click="() => $parent.$emit(\'{event}\', props.row.code)" />'
+            for event, label, color in actions
+        )
+        cells.append(f'<q-td key="actions" :props="props">{buttons}</q-td>')
+        
+        table = ui.table(columns=columns, rows=rows, row_key='code').classes(W_FULL)
+        table.props('virtual-scroll :rows-per-page-options="[0]"')
+        table.style('max-height: 600px')
+        table.add_slot('body', f'<q-tr :props="props">{"".join(cells)}</q-tr>')
+        return table
     
     def _render_geographic_risk_section(self, container, data: Dict):
         """Render geographic risk configuration"""
@@ -171,19 +276,32 @@ class ConfigurationUI:
             
             risk_levels = ["critical_risk", "high_risk", "medium_risk", "low_risk"]
             
-            with ui.tabs().classes('w-full') as tabs:
+            with ui.tabs().classes(W_FULL) as tabs:
                 for level in risk_levels:
                     ui.tab(level.replace('_', ' ').title(), name=level)
             
-            with ui.tab_panels(tabs, value=risk_levels[0]).classes('w-full'):
+            # Panels start empty and are filled the first time their tab is shown
+            self._geo_panels = {}
+            self._geo_rendered = set()
+            self._country_tables = {}
+            with ui.tab_panels(tabs, value=risk_levels[0],
+                               on_change=lambda e: self._ensure_geo_panel(e.value, data)).classes(W_FULL):
                 for level in risk_levels:
-                    with ui.tab_panel(level):
-                        level_data = data.get(level, {})
-                        self._render_country_risk_table(level, level_data)
+                    self._geo_panels[level] = ui.tab_panel(level)
+            
+            self._ensure_geo_panel(risk_levels[0], data)
+    
+    def _ensure_geo_panel(self, level: str, data: Dict):
+        """Render a geographic risk tab panel on first activation"""
+        if level in self._geo_rendered or level not in self._geo_panels:
+            return
+        with self._geo_panels[level]:
+            self._render_country_risk_table(level, data.get(level, {}))
+        self._geo_rendered.add(level)
     
     def _render_country_risk_table(self, level: str, data: Dict):
         """Render country risk configuration table"""
-        with ui.card().classes('w-full'):
+        with ui.card().classes(W_FULL):
             ui.label(f'{level.replace("_", " ").title()} Countries').classes('font-semibold mb-2')
             
             # Add new country button
@@ -200,111 +318,217 @@ class ConfigurationUI:
                                                                new_reason.value)).props('color=primary')
             
             # Countries table
-            with ui.grid(columns=6).classes('w-full gap-2'):
-                # Headers
-                for header in ["Code", "Name", "Multiplier", "Reason", "Actions"]:
-                    ui.label(header).classes('font-bold text-center p-2 bg-gray-100')
-                
-                # Data rows
-                for country_code, country_info in data.items():
-                    self._render_country_row(level, country_code, country_info)
+            table = self._create_editable_table(
+                ["Code", "Name", "Multiplier", "Reason", "Actions"],
+                [('name', False), ('multiplier', True), ('reason', False)],
+                [('delete_row', 'Delete', 'negative')],
+                self._country_rows(data)
+            )
+            table.on('cell_change', lambda e: self._update(("geographic_risk", level, e.args['code'], e.args['field']),
+                                                           e.args['value']))
+            table.on('delete_row', lambda e: self._delete_country_risk(level, e.args))
+            self._country_tables[level] = table
     
-    def _render_country_row(self, level: str, country_code: str, country_info: Dict):
-        """Render a country risk configuration row"""
-        ui.label(country_code).classes('p-2 text-center')
-        
-        # Editable fields
-        name_input = ui.input(value=country_info.get('name', '')).classes('w-full')
-        multiplier_input = ui.number(value=country_info.get('multiplier', 1.0), step=0.1).classes('w-full')
-        reason_input = ui.input(value=country_info.get('reason', '')).classes('w-full')
-        
-        # Update handlers
-        name_input.on('change', lambda e: self._update_country_risk(level, country_code, 'name', e.value))
-        multiplier_input.on('change', lambda e: self._update_country_risk(level, country_code, 'multiplier', e.value))
-        reason_input.on('change', lambda e: self._update_country_risk(level, country_code, 'reason', e.value))
-        
-        # Actions
-        ui.button('Delete', on_click=lambda: self._delete_country_risk(level, country_code)).props('size=sm color=negative')
+    @staticmethod
+    def _country_rows(data: Dict) -> List[Dict]:
+        """Table rows for one geographic risk level"""
+        return [{'code': country_code, **country_info} for country_code, country_info in data.items()
+                if isinstance(country_info, dict)]
+    
+    def _refresh_country_table(self, level: str):
+        """Swap a country table's rows in place after an add or delete"""
+        table = self._country_tables.get(level)
+        if table is None:
+            self._refresh_editor()
+            return
+        data = self._with_pending_edits(("geographic_risk", level), self._section("geographic_risk").get(level, {}))
+        table.rows[:] = self._country_rows(data)
+        table.update()
     
     def _render_risk_thresholds_section(self, container, data: Dict):
         """Render risk thresholds configuration"""
         with container:
             ui.label('Risk Scoring Thresholds').classes('text-lg font-semibold mb-4')
             
+            # One canvas shows every level's color band on the 0-100 score scale,
+            # instead of an inline-styled swatch element per row
+            scale = ui.html('').classes('w-full mb-4')
+            self._threshold_canvas_id = f'threshold-scale-{scale.id}'
+            scale.content = (f'<canvas id="{self._threshold_canvas_id}" width="606" height="24" '
+                             f'style="width: 100%; height: 24px; border: 1px solid #ccc;"></canvas>')
+            
             with ui.grid(columns=6).classes('w-full gap-4'):
                 # Headers
                 for header in ["Level", "Min Score", "Max Score", "Color", "Description", "Actions"]:
                     ui.label(header).classes('font-bold text-center p-2 bg-gray-100')
                 
                 # Data rows
+                self._threshold_models = {}
                 for level, threshold_info in data.items():
                     self._render_threshold_row(level, threshold_info)
+            
+            # Timers wait for the client connection, so the canvas exists by then
+            ui.timer(0.0, lambda: self._paint_threshold_scale(), once=True)
+    
+    def _paint_threshold_scale(self, level: Optional[str] = None):
+        """Paint one level's band on the threshold canvas, or clear and repaint all of them"""
+        bands = []
+        for name in ([level] if level else self._threshold_models):
+            model = self._threshold_models.get(name)
+            try:
+                bands.append([float(model['min']), float(model['max']), model['color']])
+            except (TypeError, ValueError, KeyError):
+                continue
+        
+        clear = '' if level else 'g.clearRect(0, 0, c.width, c.height);'
+        ui.run_javascript(
+            f'const c = document.getElementById("{self._threshold_canvas_id}");'
+            f'if (c) {{ const g = c.getContext("2d"); const w = c.width / 101; {clear}'
+            f'{json.dumps(bands)}.forEach(([lo, hi, color]) => '
+            f'{{ g.fillStyle = color; g.fillRect(lo * w, 0, (hi - lo + 1) * w, c.height); }}); }}'
+        )
     
     def _render_threshold_row(self, level: str, threshold_info: Dict):
         """Render a risk threshold configuration row"""
         ui.label(level.title()).classes('p-2 text-center')
         
+        # Widgets are bound to this model, so later value changes (e.g. a reset)
+        # are pushed into them without re-rendering the row
+        model = {
+            'min': threshold_info.get('min', 0),
+            'max': threshold_info.get('max', 100),
+            'color': threshold_info.get('color', '#000000'),
+            'description': threshold_info.get('description', '')
+        }
+        self._threshold_models[level] = model
+        
         # Editable fields
-        min_input = ui.number(value=threshold_info.get('min', 0)).classes('w-full')
-        max_input = ui.number(value=threshold_info.get('max', 100)).classes('w-full')
+        min_input = ui.number().classes(W_FULL).bind_value(model, 'min')
+        max_input = ui.number().classes(W_FULL).bind_value(model, 'max')
         
-        # Color picker
-        with ui.row().classes('items-center'):
-            color_input = ui.input(value=threshold_info.get('color', '#000000')).classes('w-20')
-            ui.element('div').style(f'width: 30px; height: 30px; background-color: {threshold_info.get("color", "#000000")}; border: 1px solid #ccc;')
+        # Color picker - repaints only this level's band on the scale canvas as the user types
+        color_input = ui.input(
+            on_change=lambda e, lv=level: self._paint_threshold_scale(lv)
+        ).classes('w-20').bind_value(model, 'color')
         
-        desc_input = ui.input(value=threshold_info.get('description', '')).classes('w-full')
+        desc_input = _text_input().bind_value(model, 'description')
         
-        # Update handlers
-        min_input.on('change', lambda e: self._update_threshold(level, 'min', e.value))
-        max_input.on('change', lambda e: self._update_threshold(level, 'max', e.value))
-        color_input.on('change', lambda e: self._update_threshold(level, 'color', e.value))
-        desc_input.on('change', lambda e: self._update_threshold(level, 'description', e.value))
+        # Update handlers - one shared handler, routed by the key tagged on each widget
+        for field, widget in (('min', min_input), ('max', max_input),
+                              ('color', color_input), ('description', desc_input)):
+            widget._route = (level, field)
+            widget.on('blur', self._on_threshold_change)
         
         # Actions
-        ui.button('Reset', on_click=lambda: self._reset_threshold(level)).props('size=sm color=secondary')
+        reset_button = ui.button('Reset', on_click=self._on_threshold_reset).props('size=sm color=secondary')
+        reset_button._route = (level, None)
+    
+    def _on_threshold_change(self, e):
+        """Shared blur handler for threshold inputs"""
+        level, field = e.sender._route
+        self._update(("risk_thresholds", level, field), e.sender.value)
+        if field in ('min', 'max'):
+            self._paint_threshold_scale()
+    
+    def _on_threshold_reset(self, e):
+        """Shared click handler for threshold reset buttons"""
+        level, _ = e.sender._route
+        self._reset_threshold(level)
+    
+    def _is_general_settings_section(self, section: str) -> bool:
+        """Whether a section renders through the general settings table"""
+        return section not in self._SECTION_HEADERS and section not in ("geographic_risk", "risk_thresholds")
+    
+    def _settings_signature(self, section: str) -> int:
+        """Cheap content hash of a general settings section as stored in config"""
+        data = self._section(section)
+        try:
+            return hash(tuple(data.items()))
+        except TypeError:
+            # Unhashable values such as lists - fall back to the repr
+            return hash(repr(data))
     
     def _render_general_settings_section(self, container, data: Dict):
         """Render general settings sections"""
+        self._last_render_signature[self.current_section] = self._settings_signature(self.current_section)
         with container:
             ui.label(f'{self.current_section.replace("_", " ").title()} Configuration').classes('text-lg font-semibold mb-4')
             
-            with ui.grid(columns=2).classes('w-full gap-4'):
-                for key, value in data.items():
-                    ui.label(key.replace('_', ' ').title()).classes('font-medium')
-                    
-                    if isinstance(value, bool):
-                        switch = ui.switch(value=value)
-                        switch.on('change', lambda e, k=key: self._update_general_setting(k, e.value))
-                    elif isinstance(value, (int, float)):
-                        number_input = ui.number(value=value)
-                        number_input.on('change', lambda e, k=key: self._update_general_setting(k, e.value))
-                    else:
-                        text_input = ui.input(value=str(value))
-                        text_input.on('change', lambda e, k=key: self._update_general_setting(k, e.value))
-    
-    # Event handlers
-    def _update_config_value(self, code: str, field: str, value: Any):
-        """Update a configuration value"""
-        current_config = self.config.get(self.current_section, {})
-        if code in current_config:
-            current_config[code][field] = value
-            self.config.set(self.current_section, current_config)
+            # Build the whole row model first, then hand it to a single table component
+            rows = []
+            for key, value in data.items():
+                if isinstance(value, bool):
+                    kind = 'bool'
+                elif isinstance(value, (int, float)):
+                    kind = 'number'
+                else:
+                    kind = 'text'
+                    value = _as_str(value)
+                rows.append({'key': key, 'label': key.replace('_', ' ').title(), 'kind': kind, 'value': value})
+            
+            emit_change = "() => $parent.$emit('setting_change', {key: props.row.key, value: props.row.value})"
+            columns = [
+                {'name': 'label', 'label': 'Setting', 'field': 'label', 'align': 'left'},
+                {'name': 'value', 'label': 'Value', 'field': 'value', 'align': 'left'}
+            ]
+            table = ui.table(columns=columns, rows=rows, row_key='key').classes(W_FULL).props('flat hide-header')
+            table.add_slot('body', f'''
+                <q-tr :props="props">
+                    <q-td key="label" :props="props" class="font-medium">{{{{ props.row.label }}}}</q-td>
+                    <q-td key="value" :props="props">
+                        <q-toggle v-if="props.row.kind === 'bool'" v-model="props.row.value"
+                                  @update:model-value="{emit_change}" />
+                        <q-input v-else-if="props.row.kind === 'number'" v-model.number="props.row.value"
+                                 type="number" dense @change="{emit_change}" />
+                        <q-input v-else v-model="props.row.value" dense @change="{emit_change}" />
+                    </q-td>
+                </q-tr>
+            ''')
+            table.on('setting_change', lambda e: self._update((self.current_section, e.args['key']), e.args['value']))
     
-    def _update_country_risk(self, level: str, country_code: str, field: str, value: Any):
-        """Update country risk configuration"""
-        path = f"geographic_risk.{level}.{country_code}.{field}"
-        self.config.set(path, value)
+    # Event handlers - field edits stay local until Save All
+    def _update(self, path: Tuple[str, ...], value: Any):
+        """Record an unsaved edit at a config path, e.g. (section, code, field)"""
+        self._dirty[path] = value
+        
+        # Keep a cached table row in step so refreshes and searches see the edit
+        if len(path) == 3:
+            section, code, field = path
+            cached = self._row_cache.get(section, {}).get(code)
+            if cached is not None:
+                row = cached[0]
+                row[field] = value
+                self._row_cache[section][code] = (row, self._search_text(row))
     
-    def _update_threshold(self, level: str, field: str, value: Any):
-        """Update risk threshold configuration"""
-        path = f"risk_thresholds.{level}.{field}"
-        self.config.set(path, value)
+    def _section(self, section: str) -> Dict:
+        """Section dict from config, fetched once until the next write to it"""
+        if section not in self._section_cache:
+            self._section_cache[section] = self.config.get(section, {})
+        return self._section_cache[section]
     
-    def _update_general_setting(self, key: str, value: Any):
-        """Update general setting"""
-        path = f"{self.current_section}.{key}"
-        self.config.set(path, value)
+    def _invalidate_section(self, section: str):
+        """Forget the cached dict and table rows for a section after writing to it"""
+        self._section_cache.pop(section, None)
+        self._row_cache.pop(section, None)
+    
+    def _with_pending_edits(self, prefix: Tuple[str, ...], data: Dict) -> Dict:
+        """Return data with unsaved edits under prefix applied (copied only if any apply)"""
+        depth = len(prefix)
+        merged = None
+        for path, value in self._dirty.items():
+            if len(path) > depth and path[:depth] == prefix:
+                if merged is None:
+                    merged = copy.deepcopy(data)
+                target = merged
+                for part in path[depth:-1]:
+                    target = target.setdefault(part, {})
+                target[path[-1]] = value
+        return data if merged is None else merged
+    
+    def _discard_pending_edits(self, prefix: Tuple[str, ...]):
+        """Drop unsaved edits at or below prefix"""
+        depth = len(prefix)
+        self._dirty = {path: value for path, value in self._dirty.items() if path[:depth] != prefix}
     
     def _add_new_config(self):
         """Add new configuration item"""
@@ -325,7 +549,7 @@ class ConfigurationUI:
             current_value = self.config_manager.get(code, '')
             with ui.dialog() as dialog, ui.card():
                 ui.label(f'Edit: {code}').classes('text-h6')
-                value_input = ui.input('Value', value=str(current_value))
+                value_input = _text_input(_as_str(current_value), 'Value')
                 
                 with ui.row():
                     ui.button('Save', on_click=lambda: self._save_edited_config(code, value_input.value, dialog))
@@ -336,12 +560,14 @@ class ConfigurationUI:
     
     def _delete_config_item(self, code: str):
         """Delete configuration item"""
-        current_config = self.config.get(self.current_section, {})
+        current_config = self._section(self.current_section)
         if code in current_config:
             del current_config[code]
             self.config.set(self.current_section, current_config)
+            self._invalidate_section(self.current_section)
+            self._discard_pending_edits((self.current_section, code))
             ui.notify(f'Deleted {code}', type='positive')
-            self._refresh_editor()
+            self._refresh_table_body()
     
     def _add_country_risk(self, level: str, code: str, name: str, multiplier: float, reason: str):
         """Add new country risk configuration"""
@@ -352,30 +578,55 @@ class ConfigurationUI:
                 "multiplier": multiplier,
                 "reason": reason
             })
+            self._invalidate_section("geographic_risk")
             ui.notify(f'Added {name} to {level}', type='positive')
-            self._refresh_editor()
+            self._refresh_country_table(level)
     
     def _delete_country_risk(self, level: str, country_code: str):
         """Delete country risk configuration"""
-        current_config = self.config.get(f"geographic_risk.{level}", {})
+        current_config = self._section("geographic_risk").get(level, {})
         if country_code in current_config:
             del current_config[country_code]
             self.config.set(f"geographic_risk.{level}", current_config)
+            self._invalidate_section("geographic_risk")
+            self._discard_pending_edits(("geographic_risk", level, country_code))
             ui.notify(f'Deleted {country_code}', type='positive')
-            self._refresh_editor()
+            self._refresh_country_table(level)
     
     def _reset_threshold(self, level: str):
         """Reset risk threshold to default"""
+        defaults = self.config._get_database_verified_defaults().get("risk_thresholds", {}).get(level)
+        if not defaults:
+            ui.notify(f'No default threshold for {level}', type='warning')
+            return
+        
+        for field, value in defaults.items():
+            self._update(("risk_thresholds", level, field), value)
+        
+        # Bound widgets pick the defaults up from the model
+        model = self._threshold_models.get(level)
+        if model is not None:
+            model.update(defaults)
+            self._paint_threshold_scale()
         ui.notify(f'Reset {level} threshold to default', type='info')
     
     def _filter_configs(self, search_term: str):
         """Filter configurations based on search term"""
         self.search_filter = search_term
-        self._refresh_editor()
+        self._needle = (search_term or '').casefold()
+        if self._data_table is not None:
+            self._refresh_table_body()
+        else:
+            self._refresh_editor()
     
-    def _save_all_configs(self):
+    async def _save_all_configs(self):
         """Save all configuration changes"""
-        self.config.save_config()
+        for path, value in self._dirty.items():
+            self.config.set_path(path, value)
+            self._invalidate_section(path[0])
+        self._dirty.clear()
+        # Serialize and write on a worker thread so the UI stays responsive
+        await asyncio.to_thread(self.config.save_config)
         ui.notify('Configuration saved successfully!', type='positive')
     
     def _reset_configs(self):
@@ -390,7 +641,10 @@ class ConfigurationUI:
     def _confirm_reset(self, dialog):
         """Confirm configuration reset"""
         # Reset current section to defaults
-        self.config.config[self.current_section] = self.config._get_comprehensive_defaults()[self.current_section]
+        self.config.config[self.current_section] = self.config._get_database_verified_defaults().get(self.current_section, {})
+        self._discard_pending_edits((self.current_section,))
+        self._invalidate_section(self.current_section)
+        self._last_render_signature.pop(self.current_section, None)  # Widgets may hold discarded edits
         ui.notify(f'Reset {self.current_section} to defaults', type='positive')
         dialog.close()
         self._refresh_editor()
@@ -411,6 +665,7 @@ class ConfigurationUI:
             # Set the configuration
             path = f"{self.current_section}.{key}"
             self.config.set(path, processed_value)
+            self._invalidate_section(self.current_section)
             ui.notify(f'Added configuration: {key}', type='positive')
             dialog.close()
             self._refresh_editor()
@@ -432,6 +687,7 @@ class ConfigurationUI:
                 processed_value = value
             
             self.config.set(key, processed_value)
+            self._invalidate_section(key.split('.')[0])
             ui.notify(f'Updated configuration: {key}', type='positive')
             dialog.close()
             self._refresh_editor()
@@ -439,14 +695,21 @@ class ConfigurationUI:
             ui.notify(f'Error updating configuration: {str(e)}', type='negative')
     
     def _refresh_editor(self):
-        """Refresh the configuration editor"""
+        """Refresh the configuration editor content, leaving sidebar and header in place"""
         try:
-            # Clear and rebuild the main container
-            if hasattr(self, 'main_container'):
-                self.main_container.clear()
-                with self.main_container:
-                    self._build_sections()
-            ui.notify('Configuration refreshed successfully', type='positive')
+            if self._content_container is None:
+                return
+            
+            # General settings already on screen and unchanged in config - nothing to rebuild
+            section = self.current_section
+            if (section == self._rendered_section and self._is_general_settings_section(section)
+                    and self._last_render_signature.get(section) == self._settings_signature(section)):
+                return
+            
+            self._title_label.text = self._editor_title()
+            self._data_table = None
+            self._content_container.clear()
+            self._render_section_content(self._content_container)
         except Exception as e:
             ui.notify(f'Error refreshing configuration: {str(e)}', type='negative')
 
@@ -2,20 +2,347 @@
 CORRECTED Database Configuration for GRID Entity Search
 Using ACTUAL database schema from comprehensive audit
 """
-from typing import Dict,List, Any
+import functools
+import re
+import sys
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict,List, Any, Iterable, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# ==================== STATIC LOOKUP TABLES ====================
+# Built once at import and exposed through read-only MappingProxyType views, so every
+# property access returns the same object and callers cannot mutate shared state
+
+# ACTUAL COLUMN NAMES
+_COLUMNS = {
+    # Main entity columns (mapping tables)
+    'entity_id': 'entity_id',
+    'risk_id': 'risk_id', 
+    'record_type': 'recordDefinitionType',
+    'source_item_id': 'source_item_id',
+    'entity_name': 'entity_name',
+    'system_id': 'systemId',
+    'entity_date': 'entityDate',
+    
+    # Event columns
+    'event_category': 'event_category_code',
+    'event_subcategory': 'event_sub_category_code', 
+    'event_date': 'event_date',
+    'event_end_date': 'event_end_date',
+    'event_description': 'event_description',
+    'event_source_id': 'event_reference_source_item_id',
+    
+    # Attribute columns (PEP data stored here)
+    'attribute_type': 'alias_code_type',  # 'PTY' for PEP data
+    'attribute_value': 'alias_value',      # Actual PEP values
+    
+    # Address columns
+    'address_country': 'address_country',
+    'address_city': 'address_city',
+    'address_line1': 'address_line1', 
+    'address_line2': 'address_line2',
+    'address_province': 'address_province',
+    'address_type': 'address_type',
+    'address_raw': 'address_raw_format',
+    
+    # Alias columns
+    'alias_name': 'alias_name',
+    'alias_type': 'alias_code_type',
+    
+    # Identification columns
+    'id_type': 'identification_type',
+    'id_value': 'identification_value',
+    'id_country': 'identification_country',
+    
+    # Date of birth columns
+    'birth_year': 'date_of_birth_year',
+    'birth_month': 'date_of_birth_month', 
+    'birth_day': 'date_of_birth_day',
+    
+    # Relationship columns
+    'related_entity_id': 'related_entity_id',
+    'related_entity_name': 'related_entity_name',
+    'relationship_type': 'type',
+    'relationship_direction': 'direction',
+    
+    # Source columns
+    'source_name': 'name',
+    'source_url': 'url',
+    'source_description': 'description',
+    'source_type': 'type',
+    'source_publication': 'publication',
+    
+    # ORBIS mapping columns
+    'orbis_risk_id': 'riskid',
+    'orbis_entity_id': 'entityid', 
+    'orbis_bvd_id': 'bvdid',
+    'orbis_entity_type': 'entitytype',
+    'orbis_event_code': 'eventcode',
+    'orbis_entity_name': 'entityname'
+}
+
+# PEP ATTRIBUTE TYPES (stored in the attributes table)
+_PEP_ATTRIBUTE_TYPES = {
+    'PEP_TYPE': 'PTY',        # Main PEP classification 
+    'PEP_RATING': 'PRT',      # PEP rating/grade
+    'PEP_LEVEL': 'PLV',       # PEP level (but rarely used)
+    'RISK_SCORE': 'RSC',      # Risk score attribute
+    'RISKOGRAPHY': 'RGP'      # Risk description
+}
+
+# REAL PEP TYPE CODES
+_PEP_TYPES = {
+    # Political Officials
+    'HOS': {'name': 'Head of State', 'level': 'L6', 'risk_multiplier': 2.0},
+    'CAB': {'name': 'Cabinet Officials', 'level': 'L5', 'risk_multiplier': 1.8},
+    'INF': {'name': 'Senior Infrastructure Officials', 'level': 'L4', 'risk_multiplier': 1.6},
+    'NIO': {'name': 'Senior Non-Infrastructure Officials', 'level': 'L4', 'risk_multiplier': 1.6},
+    'MUN': {'name': 'Municipal Officials', 'level': 'L3', 'risk_multiplier': 1.4},
+    'REG': {'name': 'Regional Officials', 'level': 'L3', 'risk_multiplier': 1.4},
+    'LEG': {'name': 'Senior Legislative', 'level': 'L4', 'risk_multiplier': 1.6},
+    'AMB': {'name': 'Ambassadors/Diplomatic', 'level': 'L4', 'risk_multiplier': 1.6},
+    'MIL': {'name': 'Senior Military', 'level': 'L4', 'risk_multiplier': 1.6},
+    'JUD': {'name': 'Senior Judicial', 'level': 'L4', 'risk_multiplier': 1.6},
+    'POL': {'name': 'Political Party Figures', 'level': 'L3', 'risk_multiplier': 1.4},
+    
+    # Business/Organizations
+    'GOE': {'name': 'Government Owned Enterprises', 'level': 'L3', 'risk_multiplier': 1.4},
+    'GCO': {'name': 'State-Controlled Business', 'level': 'L3', 'risk_multiplier': 1.4},
+    'IGO': {'name': 'International Gov Organization', 'level': 'L3', 'risk_multiplier': 1.4},
+    'ISO': {'name': 'International Sporting Officials', 'level': 'L2', 'risk_multiplier': 1.2},
+    
+    # Family/Associates
+    'FAM': {'name': 'Family Members', 'level': 'L2', 'risk_multiplier': 1.2},
+    'ASC': {'name': 'Close Associates', 'level': 'L1', 'risk_multiplier': 1.1}
+}
+
+# REAL EVENT CATEGORIES
+_EVENT_CATEGORIES = {
+    # Critical Risk (90-100)
+    'TER': {'name': 'Terrorism', 'risk_score': 100, 'severity': 'critical'},
+    'WLT': {'name': 'Watch List', 'risk_score': 100, 'severity': 'critical'},
+    'DEN': {'name': 'Denied Entity', 'risk_score': 95, 'severity': 'critical'},
+    'DTF': {'name': 'Drug Trafficking', 'risk_score': 90, 'severity': 'critical'},
+    'TRF': {'name': 'Human Trafficking', 'risk_score': 90, 'severity': 'critical'},
+    
+    # High Risk (70-89)  
+    'MLA': {'name': 'Money Laundering', 'risk_score': 85, 'severity': 'high'},
+    'HUM': {'name': 'Human Rights Violations', 'risk_score': 85, 'severity': 'high'},
+    'ORG': {'name': 'Organized Crime', 'risk_score': 85, 'severity': 'high'},
+    'KID': {'name': 'Kidnapping', 'risk_score': 85, 'severity': 'high'},
+    'SPY': {'name': 'Espionage/Spying', 'risk_score': 85, 'severity': 'high'},
+    'BRB': {'name': 'Bribery/Corruption', 'risk_score': 75, 'severity': 'high'},
+    'FRD': {'name': 'Fraud', 'risk_score': 70, 'severity': 'high'},
+    'TAX': {'name': 'Tax Offenses', 'risk_score': 70, 'severity': 'high'},
+    'SEC': {'name': 'Securities Violations', 'risk_score': 70, 'severity': 'high'},
+    
+    # Medium Risk (40-69)
+    'REG': {'name': 'Regulatory Action', 'risk_score': 65, 'severity': 'medium'},
+    'ROB': {'name': 'Robbery', 'risk_score': 60, 'severity': 'medium'},
+    'SEX': {'name': 'Sex Offenses', 'risk_score': 60, 'severity': 'medium'},
+    'PEP': {'name': 'PEP Classification', 'risk_score': 60, 'severity': 'medium'},
+    'SNX': {'name': 'Sanctions', 'risk_score': 60, 'severity': 'medium'},
+    'MUR': {'name': 'Murder/Manslaughter', 'risk_score': 55, 'severity': 'medium'},
+    'AST': {'name': 'Assault/Battery', 'risk_score': 55, 'severity': 'medium'},
+    'FUG': {'name': 'Fugitive', 'risk_score': 50, 'severity': 'medium'},
+    'BUR': {'name': 'Burglary', 'risk_score': 50, 'severity': 'medium'},
+    'TFT': {'name': 'Theft', 'risk_score': 50, 'severity': 'medium'},
+    'IGN': {'name': 'Weapons/Guns', 'risk_score': 50, 'severity': 'medium'},
+    'CON': {'name': 'Conspiracy', 'risk_score': 45, 'severity': 'medium'},
+    'CFT': {'name': 'Counterfeiting', 'risk_score': 45, 'severity': 'medium'},
+    'SMG': {'name': 'Smuggling', 'risk_score': 45, 'severity': 'medium'},
+    'PSP': {'name': 'Stolen Property', 'risk_score': 40, 'severity': 'medium'},
+    'IMP': {'name': 'Identity Theft', 'risk_score': 40, 'severity': 'medium'},
+    'CYB': {'name': 'Cybercrime', 'risk_score': 40, 'severity': 'medium'},
+    'OBS': {'name': 'Obscenity', 'risk_score': 40, 'severity': 'medium'},
+    
+    # Low Risk (0-39)
+    'DPS': {'name': 'Drug Possession', 'risk_score': 35, 'severity': 'low'},
+    'NSC': {'name': 'Non-Specific Crime', 'risk_score': 30, 'severity': 'low'},
+    'MIS': {'name': 'Misconduct', 'risk_score': 30, 'severity': 'low'},
+    'ABU': {'name': 'Abuse', 'risk_score': 30, 'severity': 'low'},
+    'PRJ': {'name': 'Perjury', 'risk_score': 30, 'severity': 'low'},
+    'ENV': {'name': 'Environmental Crimes', 'risk_score': 25, 'severity': 'low'},
+    'GAM': {'name': 'Illegal Gambling', 'risk_score': 25, 'severity': 'low'},
+    'ARS': {'name': 'Arson', 'risk_score': 25, 'severity': 'low'},
+    'BUS': {'name': 'Business Crimes', 'risk_score': 25, 'severity': 'low'},
+    'IPR': {'name': 'Prostitution', 'risk_score': 20, 'severity': 'low'},
+    'LNS': {'name': 'Loan Sharking', 'risk_score': 20, 'severity': 'low'},
+    'CPR': {'name': 'Copyright Infringement', 'risk_score': 20, 'severity': 'low'},
+    'BKY': {'name': 'Bankruptcy', 'risk_score': 20, 'severity': 'low'},
+    'RES': {'name': 'Real Estate Actions', 'risk_score': 20, 'severity': 'low'},
+    'MOR': {'name': 'Mortgage Related', 'risk_score': 20, 'severity': 'low'},
+    'IRC': {'name': 'Iran Connect', 'risk_score': 20, 'severity': 'low'},
+    'FAR': {'name': 'Foreign Agent Registration', 'risk_score': 15, 'severity': 'low'},
+    'LMD': {'name': 'Legal Marijuana', 'risk_score': 15, 'severity': 'low'},
+    'DPP': {'name': 'Data Privacy', 'risk_score': 15, 'severity': 'low'},
+    'FOF': {'name': 'Former OFAC', 'risk_score': 10, 'severity': 'low'},
+    'FOS': {'name': 'Former Sanctions', 'risk_score': 10, 'severity': 'low'},
+    'FOR': {'name': 'Forfeiture', 'risk_score': 10, 'severity': 'low'},
+    'MSB': {'name': 'Money Services Business', 'risk_score': 10, 'severity': 'low'},
+    'HTE': {'name': 'Hate Crimes', 'risk_score': 10, 'severity': 'low'},
+    'BIL': {'name': 'Billing Practices', 'risk_score': 5, 'severity': 'low'},
+    'CND': {'name': 'Financial Condition', 'risk_score': 5, 'severity': 'low'},
+    'DEF': {'name': 'Default Risk', 'risk_score': 5, 'severity': 'low'},
+    'HCD': {'name': 'Healthcare Disciplines', 'risk_score': 5, 'severity': 'low'},
+    'PER': {'name': 'Performance Risk', 'risk_score': 5, 'severity': 'low'},
+    'REO': {'name': 'Restructuring Risk', 'risk_score': 5, 'severity': 'low'},
+    'VCY': {'name': 'Virtual Currency', 'risk_score': 5, 'severity': 'low'}
+}
+
+# REAL EVENT SUB-CATEGORIES
+_EVENT_SUBCATEGORIES = {
+    # High severity modifiers (1.2-1.3x)
+    'CVT': {'name': 'Convicted', 'multiplier': 1.3},
+    'CNF': {'name': 'Confession', 'multiplier': 1.2},
+    'SAN': {'name': 'Sanctioned', 'multiplier': 1.2},
+    'SJT': {'name': 'Jail Time', 'multiplier': 1.2},
+    'GOV': {'name': 'Government Official', 'multiplier': 1.2},
+    
+    # Medium-high severity (1.0-1.1x)
+    'ART': {'name': 'Arrested', 'multiplier': 1.1},
+    'IND': {'name': 'Indicted', 'multiplier': 1.1}, 
+    'WTD': {'name': 'Wanted', 'multiplier': 1.1},
+    'CHG': {'name': 'Charged', 'multiplier': 1.0},
+    'ARN': {'name': 'Arraigned', 'multiplier': 1.0},
+    'ACT': {'name': 'Regulatory Action', 'multiplier': 1.0},
+    'PLE': {'name': 'Plea', 'multiplier': 1.0},
+    'CSP': {'name': 'Conspiracy', 'multiplier': 1.0},
+    'TRL': {'name': 'Trial', 'multiplier': 1.0},
+    'DEP': {'name': 'Deported', 'multiplier': 1.0},
+    'SEZ': {'name': 'Seizure', 'multiplier': 1.0},
+    'RVK': {'name': 'Revoked', 'multiplier': 1.0},
+    'FIM': {'name': 'Fine >$10K', 'multiplier': 1.0},
+    
+    # Lower severity (0.8-0.9x)
+    'EXP': {'name': 'Expelled', 'multiplier': 0.9},
+    'CEN': {'name': 'Censured', 'multiplier': 0.9},
+    'SPD': {'name': 'Suspended', 'multiplier': 0.9},
+    'CMP': {'name': 'Complaint', 'multiplier': 0.8},
+    'APL': {'name': 'Appeal', 'multiplier': 0.8},
+    'SET': {'name': 'Settlement', 'multiplier': 0.8},
+    'LIC': {'name': 'License Action', 'multiplier': 0.8},
+    
+    # Low severity (0.6-0.7x)
+    'ACC': {'name': 'Accused', 'multiplier': 0.7},
+    'FIL': {'name': 'Fine <$10K', 'multiplier': 0.7},
+    'PRB': {'name': 'Probe', 'multiplier': 0.7},
+    'ADT': {'name': 'Audit', 'multiplier': 0.7},
+    'ALL': {'name': 'Alleged', 'multiplier': 0.6},
+    'LIN': {'name': 'Lien', 'multiplier': 0.6},
+    'SPT': {'name': 'Suspected', 'multiplier': 0.6},
+    
+    # Minimal severity (0.4-0.5x)
+    'ACQ': {'name': 'Acquitted', 'multiplier': 0.5},
+    'ASC': {'name': 'Associated', 'multiplier': 0.5},
+    'DMS': {'name': 'Dismissed', 'multiplier': 0.4}
+}
+
+# Code keys are interned so lookups with intern_code()-ed row values hit the identity fast path
+_PEP_TYPES = {sys.intern(code): info for code, info in _PEP_TYPES.items()}
+_EVENT_CATEGORIES = {sys.intern(code): info for code, info in _EVENT_CATEGORIES.items()}
+_EVENT_SUBCATEGORIES = {sys.intern(code): info for code, info in _EVENT_SUBCATEGORIES.items()}
+
+COLUMNS = MappingProxyType(_COLUMNS)
+PEP_ATTRIBUTE_TYPES = MappingProxyType(_PEP_ATTRIBUTE_TYPES)
+PEP_TYPES = MappingProxyType(_PEP_TYPES)
+EVENT_CATEGORIES = MappingProxyType(_EVENT_CATEGORIES)
+EVENT_SUBCATEGORIES = MappingProxyType(_EVENT_SUBCATEGORIES)
+
+# Ordinal encoding for vectorized scoring: encode codes once on ingest, then
+# scores = RISK_SCORE_TABLE[idx_array]. Slots past the last code hold the neutral
+# value (score 0, multiplier 1.0), and index len(CODE_TO_IDX) is used for unknown codes
+CODE_TO_IDX = MappingProxyType({code: i for i, code in enumerate(_EVENT_CATEGORIES)})
+SUB_CODE_TO_IDX = MappingProxyType({code: i for i, code in enumerate(_EVENT_SUBCATEGORIES)})
+_SCORE_TABLE_SIZE = 64
+
+if NUMPY_AVAILABLE:
+    RISK_SCORE_TABLE = np.zeros(max(_SCORE_TABLE_SIZE, len(CODE_TO_IDX) + 1), dtype=np.int8)
+    RISK_SCORE_TABLE[:len(CODE_TO_IDX)] = [info['risk_score'] for info in _EVENT_CATEGORIES.values()]
+    RISK_SCORE_TABLE.setflags(write=False)
+    MULTIPLIER_TABLE = np.ones(max(_SCORE_TABLE_SIZE, len(SUB_CODE_TO_IDX) + 1), dtype=np.float32)
+    MULTIPLIER_TABLE[:len(SUB_CODE_TO_IDX)] = [info['multiplier'] for info in _EVENT_SUBCATEGORIES.values()]
+    MULTIPLIER_TABLE.setflags(write=False)
+else:
+    RISK_SCORE_TABLE = None
+    MULTIPLIER_TABLE = None
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """A built query with its bound parameters and the cursor fetch size to run it with.
+    
+    Driver defaults fetch a handful of rows per round trip; set the cursor from the plan
+    (plan.configure(cursor)) so large results stream in fewer, bigger batches.
+    """
+    sql: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    fetch_size: int = 1000
+    
+    def configure(self, cursor) -> None:
+        """Apply the recommended fetch size to a DB-API cursor"""
+        cursor.arraysize = self.fetch_size
+
+def intern_code(code: str) -> str:
+    """Intern a code read from a result row, so lookups in the code dicts match by identity"""
+    return sys.intern(code)
 
 class CorrectedDatabaseConfig:
     """Database configuration with ACTUAL table and column names"""
     
+    # Optional aggregate columns of the search query: name -> (child table suffix, subquery).
+    # Each child table is aggregated per entity in its own subquery before the join, so
+    # the lists never repeat values once per row of the other child tables
+    _SEARCH_AGGREGATES = {
+        'events': ('events', """
+            SELECT entity_id, COLLECT_LIST(STRUCT(
+                event_category_code,
+                event_sub_category_code, 
+                event_date,
+                event_description
+            )) AS events
+            FROM {table}
+            GROUP BY entity_id"""),
+        'pep_types': ('attributes', """
+            SELECT entity_id, COLLECT_SET(alias_value) AS pep_types
+            FROM {table}
+            WHERE alias_code_type = 'PTY'
+            GROUP BY entity_id"""),
+        'addresses': ('addresses', """
+            SELECT entity_id, COLLECT_SET(STRUCT(
+                address_country,
+                address_city,
+                address_type
+            )) AS addresses
+            FROM {table}
+            GROUP BY entity_id"""),
+        'aliases': ('aliases', """
+            SELECT entity_id, COLLECT_SET(alias_name) AS aliases
+            FROM {table}
+            GROUP BY entity_id""")
+    }
+    
+    # Fixed instance layout for the shared singleton; every attribute set in __init__ must be listed here
+    __slots__ = (
+        'catalog', 'schema',
+        '_tables',
+        'events_by_severity', 'pep_types_by_level', 'critical_events', '_valid_event_codes', '_valid_pep_types',
+        '_critical_events_sql', '_all_events_sql', '_comprehensive_rank_events_sql',
+        '_search_skeletons', '_comprehensive_skeleton', '_search_sql'
+    )
+    
     def __init__(self):
         self.catalog = "prd_bronze_catalog"
         self.schema = "grid"
         
-    # ==================== ACTUAL TABLE NAMES ====================
-    
-    @property 
-    def tables(self):
-        return {
+        # Table names are formatted once here; the tables property hands out this dict
+        # instead of rebuilding it on every access
+        self._tables = {
             # Individual entity tables
             'individual_mapping': f"{self.catalog}.{self.schema}.individual_mapping",
             'individual_events': f"{self.catalog}.{self.schema}.individual_events", 
@@ -39,366 +366,204 @@ class CorrectedDatabaseConfig:
             'code_dictionary': f"{self.catalog}.{self.schema}.code_dictionary",
             'grid_orbis_mapping': f"{self.catalog}.{self.schema}.grid_orbis_mapping"
         }
+        
+        # Inverted indexes, so "all critical events" or "all L4 PEP types" is a dict hit instead of a scan
+        self.events_by_severity: Dict[str, List[str]] = {}
+        for code, info in EVENT_CATEGORIES.items():
+            self.events_by_severity.setdefault(info['severity'], []).append(code)
+        self.pep_types_by_level: Dict[str, List[str]] = {}
+        for code, info in PEP_TYPES.items():
+            self.pep_types_by_level.setdefault(info['level'], []).append(code)
+        self.critical_events = frozenset(
+            code for code, info in EVENT_CATEGORIES.items() if info['risk_score'] >= 90
+        )
+        
+        # Known codes, for whitelisting filter values before they reach a query
+        self._valid_event_codes = frozenset(EVENT_CATEGORIES)
+        self._valid_pep_types = frozenset(PEP_TYPES)
+        
+        # IN-list fragments over the static vocabularies, formatted once for the builders
+        self._critical_events_sql = self._sql_in_list(self.critical_events)
+        self._all_events_sql = self._sql_in_list(self._valid_event_codes)
+        self._comprehensive_rank_events_sql = self._sql_in_list(('BRB', 'PEP', 'MLA'))
+        
+        # Static SQL of the query builders, compiled once; each call only adds its WHERE clause
+        # Search skeletons are keyed by (entity type, aggregates); the full projection is prebuilt
+        self._search_skeletons: Dict[Tuple[str, Tuple[str, ...]], Tuple[str, str]] = {}
+        for entity_type in ('individual', 'organization'):
+            self._search_skeleton(entity_type, tuple(self._SEARCH_AGGREGATES))
+        
+        # Finished search SQL by input shape; values live in params, so repeated and
+        # similar searches (paging, refresh, other names) reuse the same text
+        self._search_sql = functools.lru_cache(maxsize=512)(self._build_search_sql)
+        self._comprehensive_skeleton = self._compile_comprehensive_skeleton()
+        
+    # ==================== ACTUAL TABLE NAMES ====================
+    
+    @property
+    def tables(self):
+        return self._tables
     
     # ==================== ACTUAL COLUMN NAMES ====================
     
     @property
     def columns(self):
-        return {
-            # Main entity columns (mapping tables)
-            'entity_id': 'entity_id',
-            'risk_id': 'risk_id', 
-            'record_type': 'recordDefinitionType',
-            'source_item_id': 'source_item_id',
-            'entity_name': 'entity_name',
-            'system_id': 'systemId',
-            'entity_date': 'entityDate',
-            
-            # Event columns
-            'event_category': 'event_category_code',
-            'event_subcategory': 'event_sub_category_code', 
-            'event_date': 'event_date',
-            'event_end_date': 'event_end_date',
-            'event_description': 'event_description',
-            'event_source_id': 'event_reference_source_item_id',
-            
-            # Attribute columns (PEP data stored here)
-            'attribute_type': 'alias_code_type',  # 'PTY' for PEP data
-            'attribute_value': 'alias_value',      # Actual PEP values
-            
-            # Address columns
-            'address_country': 'address_country',
-            'address_city': 'address_city',
-            'address_line1': 'address_line1', 
-            'address_line2': 'address_line2',
-            'address_province': 'address_province',
-            'address_type': 'address_type',
-            'address_raw': 'address_raw_format',
-            
-            # Alias columns
-            'alias_name': 'alias_name',
-            'alias_type': 'alias_code_type',
-            
-            # Identification columns
-            'id_type': 'identification_type',
-            'id_value': 'identification_value',
-            'id_country': 'identification_country',
-            
-            # Date of birth columns
-            'birth_year': 'date_of_birth_year',
-            'birth_month': 'date_of_birth_month', 
-            'birth_day': 'date_of_birth_day',
-            
-            # Relationship columns
-            'related_entity_id': 'related_entity_id',
-            'related_entity_name': 'related_entity_name',
-            'relationship_type': 'type',
-            'relationship_direction': 'direction',
-            
-            # Source columns
-            'source_name': 'name',
-            'source_url': 'url',
-            'source_description': 'description',
-            'source_type': 'type',
-            'source_publication': 'publication',
-            
-            # ORBIS mapping columns
-            'orbis_risk_id': 'riskid',
-            'orbis_entity_id': 'entityid', 
-            'orbis_bvd_id': 'bvdid',
-            'orbis_entity_type': 'entitytype',
-            'orbis_event_code': 'eventcode',
-            'orbis_entity_name': 'entityname'
-        }
+        return COLUMNS
     
     # ==================== PEP ATTRIBUTE TYPES ====================
     
     @property
     def pep_attribute_types(self):
         """PEP data is stored in attributes table with specific types"""
-        return {
-            'PEP_TYPE': 'PTY',        # Main PEP classification 
-            'PEP_RATING': 'PRT',      # PEP rating/grade
-            'PEP_LEVEL': 'PLV',       # PEP level (but rarely used)
-            'RISK_SCORE': 'RSC',      # Risk score attribute
-            'RISKOGRAPHY': 'RGP'      # Risk description
-        }
+        return PEP_ATTRIBUTE_TYPES
     
     # ==================== REAL PEP TYPE CODES ====================
     
     @property
     def pep_types(self):
         """Actual PEP type codes from PEP.txt and database verification"""
-        return {
-            # Political Officials
-            'HOS': {'name': 'Head of State', 'level': 'L6', 'risk_multiplier': 2.0},
-            'CAB': {'name': 'Cabinet Officials', 'level': 'L5', 'risk_multiplier': 1.8},
-            'INF': {'name': 'Senior Infrastructure Officials', 'level': 'L4', 'risk_multiplier': 1.6},
-            'NIO': {'name': 'Senior Non-Infrastructure Officials', 'level': 'L4', 'risk_multiplier': 1.6},
-            'MUN': {'name': 'Municipal Officials', 'level': 'L3', 'risk_multiplier': 1.4},
-            'REG': {'name': 'Regional Officials', 'level': 'L3', 'risk_multiplier': 1.4},
-            'LEG': {'name': 'Senior Legislative', 'level': 'L4', 'risk_multiplier': 1.6},
-            'AMB': {'name': 'Ambassadors/Diplomatic', 'level': 'L4', 'risk_multiplier': 1.6},
-            'MIL': {'name': 'Senior Military', 'level': 'L4', 'risk_multiplier': 1.6},
-            'JUD': {'name': 'Senior Judicial', 'level': 'L4', 'risk_multiplier': 1.6},
-            'POL': {'name': 'Political Party Figures', 'level': 'L3', 'risk_multiplier': 1.4},
-            
-            # Business/Organizations
-            'GOE': {'name': 'Government Owned Enterprises', 'level': 'L3', 'risk_multiplier': 1.4},
-            'GCO': {'name': 'State-Controlled Business', 'level': 'L3', 'risk_multiplier': 1.4},
-            'IGO': {'name': 'International Gov Organization', 'level': 'L3', 'risk_multiplier': 1.4},
-            'ISO': {'name': 'International Sporting Officials', 'level': 'L2', 'risk_multiplier': 1.2},
-            
-            # Family/Associates
-            'FAM': {'name': 'Family Members', 'level': 'L2', 'risk_multiplier': 1.2},
-            'ASC': {'name': 'Close Associates', 'level': 'L1', 'risk_multiplier': 1.1}
-        }
+        return PEP_TYPES
     
     # ==================== REAL EVENT CATEGORIES ====================
     
-    @property 
+    @property
     def event_categories(self):
         """63 actual event categories from database code_dictionary"""
-        return {
-            # Critical Risk (90-100)
-            'TER': {'name': 'Terrorism', 'risk_score': 100, 'severity': 'critical'},
-            'WLT': {'name': 'Watch List', 'risk_score': 100, 'severity': 'critical'},
-            'DEN': {'name': 'Denied Entity', 'risk_score': 95, 'severity': 'critical'},
-            'DTF': {'name': 'Drug Trafficking', 'risk_score': 90, 'severity': 'critical'},
-            'TRF': {'name': 'Human Trafficking', 'risk_score': 90, 'severity': 'critical'},
-            
-            # High Risk (70-89)  
-            'MLA': {'name': 'Money Laundering', 'risk_score': 85, 'severity': 'high'},
-            'HUM': {'name': 'Human Rights Violations', 'risk_score': 85, 'severity': 'high'},
-            'ORG': {'name': 'Organized Crime', 'risk_score': 85, 'severity': 'high'},
-            'KID': {'name': 'Kidnapping', 'risk_score': 85, 'severity': 'high'},
-            'SPY': {'name': 'Espionage/Spying', 'risk_score': 85, 'severity': 'high'},
-            'BRB': {'name': 'Bribery/Corruption', 'risk_score': 75, 'severity': 'high'},
-            'FRD': {'name': 'Fraud', 'risk_score': 70, 'severity': 'high'},
-            'TAX': {'name': 'Tax Offenses', 'risk_score': 70, 'severity': 'high'},
-            'SEC': {'name': 'Securities Violations', 'risk_score': 70, 'severity': 'high'},
-            
-            # Medium Risk (40-69)
-            'REG': {'name': 'Regulatory Action', 'risk_score': 65, 'severity': 'medium'},
-            'ROB': {'name': 'Robbery', 'risk_score': 60, 'severity': 'medium'},
-            'SEX': {'name': 'Sex Offenses', 'risk_score': 60, 'severity': 'medium'},
-            'PEP': {'name': 'PEP Classification', 'risk_score': 60, 'severity': 'medium'},
-            'SNX': {'name': 'Sanctions', 'risk_score': 60, 'severity': 'medium'},
-            'MUR': {'name': 'Murder/Manslaughter', 'risk_score': 55, 'severity': 'medium'},
-            'AST': {'name': 'Assault/Battery', 'risk_score': 55, 'severity': 'medium'},
-            'FUG': {'name': 'Fugitive', 'risk_score': 50, 'severity': 'medium'},
-            'BUR': {'name': 'Burglary', 'risk_score': 50, 'severity': 'medium'},
-            'TFT': {'name': 'Theft', 'risk_score': 50, 'severity': 'medium'},
-            'IGN': {'name': 'Weapons/Guns', 'risk_score': 50, 'severity': 'medium'},
-            'CON': {'name': 'Conspiracy', 'risk_score': 45, 'severity': 'medium'},
-            'CFT': {'name': 'Counterfeiting', 'risk_score': 45, 'severity': 'medium'},
-            'SMG': {'name': 'Smuggling', 'risk_score': 45, 'severity': 'medium'},
-            'PSP': {'name': 'Stolen Property', 'risk_score': 40, 'severity': 'medium'},
-            'IMP': {'name': 'Identity Theft', 'risk_score': 40, 'severity': 'medium'},
-            'CYB': {'name': 'Cybercrime', 'risk_score': 40, 'severity': 'medium'},
-            'OBS': {'name': 'Obscenity', 'risk_score': 40, 'severity': 'medium'},
-            
-            # Low Risk (0-39)
-            'DPS': {'name': 'Drug Possession', 'risk_score': 35, 'severity': 'low'},
-            'NSC': {'name': 'Non-Specific Crime', 'risk_score': 30, 'severity': 'low'},
-            'MIS': {'name': 'Misconduct', 'risk_score': 30, 'severity': 'low'},
-            'ABU': {'name': 'Abuse', 'risk_score': 30, 'severity': 'low'},
-            'PRJ': {'name': 'Perjury', 'risk_score': 30, 'severity': 'low'},
-            'ENV': {'name': 'Environmental Crimes', 'risk_score': 25, 'severity': 'low'},
-            'GAM': {'name': 'Illegal Gambling', 'risk_score': 25, 'severity': 'low'},
-            'ARS': {'name': 'Arson', 'risk_score': 25, 'severity': 'low'},
-            'BUS': {'name': 'Business Crimes', 'risk_score': 25, 'severity': 'low'},
-            'IPR': {'name': 'Prostitution', 'risk_score': 20, 'severity': 'low'},
-            'LNS': {'name': 'Loan Sharking', 'risk_score': 20, 'severity': 'low'},
-            'CPR': {'name': 'Copyright Infringement', 'risk_score': 20, 'severity': 'low'},
-            'BKY': {'name': 'Bankruptcy', 'risk_score': 20, 'severity': 'low'},
-            'RES': {'name': 'Real Estate Actions', 'risk_score': 20, 'severity': 'low'},
-            'MOR': {'name': 'Mortgage Related', 'risk_score': 20, 'severity': 'low'},
-            'IRC': {'name': 'Iran Connect', 'risk_score': 20, 'severity': 'low'},
-            'FAR': {'name': 'Foreign Agent Registration', 'risk_score': 15, 'severity': 'low'},
-            'LMD': {'name': 'Legal Marijuana', 'risk_score': 15, 'severity': 'low'},
-            'DPP': {'name': 'Data Privacy', 'risk_score': 15, 'severity': 'low'},
-            'FOF': {'name': 'Former OFAC', 'risk_score': 10, 'severity': 'low'},
-            'FOS': {'name': 'Former Sanctions', 'risk_score': 10, 'severity': 'low'},
-            'FOR': {'name': 'Forfeiture', 'risk_score': 10, 'severity': 'low'},
-            'MSB': {'name': 'Money Services Business', 'risk_score': 10, 'severity': 'low'},
-            'HTE': {'name': 'Hate Crimes', 'risk_score': 10, 'severity': 'low'},
-            'BIL': {'name': 'Billing Practices', 'risk_score': 5, 'severity': 'low'},
-            'CND': {'name': 'Financial Condition', 'risk_score': 5, 'severity': 'low'},
-            'DEF': {'name': 'Default Risk', 'risk_score': 5, 'severity': 'low'},
-            'HCD': {'name': 'Healthcare Disciplines', 'risk_score': 5, 'severity': 'low'},
-            'PER': {'name': 'Performance Risk', 'risk_score': 5, 'severity': 'low'},
-            'REO': {'name': 'Restructuring Risk', 'risk_score': 5, 'severity': 'low'},
-            'VCY': {'name': 'Virtual Currency', 'risk_score': 5, 'severity': 'low'}
-        }
+        return EVENT_CATEGORIES
     
     # ==================== REAL EVENT SUB-CATEGORIES ====================
     
     @property
     def event_subcategories(self):
         """36 actual event sub-categories from database code_dictionary"""
-        return {
-            # High severity modifiers (1.2-1.3x)
-            'CVT': {'name': 'Convicted', 'multiplier': 1.3},
-            'CNF': {'name': 'Confession', 'multiplier': 1.2},
-            'SAN': {'name': 'Sanctioned', 'multiplier': 1.2},
-            'SJT': {'name': 'Jail Time', 'multiplier': 1.2},
-            'GOV': {'name': 'Government Official', 'multiplier': 1.2},
-            
-            # Medium-high severity (1.0-1.1x)
-            'ART': {'name': 'Arrested', 'multiplier': 1.1},
-            'IND': {'name': 'Indicted', 'multiplier': 1.1}, 
-            'WTD': {'name': 'Wanted', 'multiplier': 1.1},
-            'CHG': {'name': 'Charged', 'multiplier': 1.0},
-            'ARN': {'name': 'Arraigned', 'multiplier': 1.0},
-            'ACT': {'name': 'Regulatory Action', 'multiplier': 1.0},
-            'PLE': {'name': 'Plea', 'multiplier': 1.0},
-            'CSP': {'name': 'Conspiracy', 'multiplier': 1.0},
-            'TRL': {'name': 'Trial', 'multiplier': 1.0},
-            'DEP': {'name': 'Deported', 'multiplier': 1.0},
-            'SEZ': {'name': 'Seizure', 'multiplier': 1.0},
-            'RVK': {'name': 'Revoked', 'multiplier': 1.0},
-            'FIM': {'name': 'Fine >$10K', 'multiplier': 1.0},
-            
-            # Lower severity (0.8-0.9x)
-            'EXP': {'name': 'Expelled', 'multiplier': 0.9},
-            'CEN': {'name': 'Censured', 'multiplier': 0.9},
-            'SPD': {'name': 'Suspended', 'multiplier': 0.9},
-            'CMP': {'name': 'Complaint', 'multiplier': 0.8},
-            'APL': {'name': 'Appeal', 'multiplier': 0.8},
-            'SET': {'name': 'Settlement', 'multiplier': 0.8},
-            'LIC': {'name': 'License Action', 'multiplier': 0.8},
-            
-            # Low severity (0.6-0.7x)
-            'ACC': {'name': 'Accused', 'multiplier': 0.7},
-            'FIL': {'name': 'Fine <$10K', 'multiplier': 0.7},
-            'PRB': {'name': 'Probe', 'multiplier': 0.7},
-            'ADT': {'name': 'Audit', 'multiplier': 0.7},
-            'ALL': {'name': 'Alleged', 'multiplier': 0.6},
-            'LIN': {'name': 'Lien', 'multiplier': 0.6},
-            'SPT': {'name': 'Suspected', 'multiplier': 0.6},
-            
-            # Minimal severity (0.4-0.5x)
-            'ACQ': {'name': 'Acquitted', 'multiplier': 0.5},
-            'ASC': {'name': 'Associated', 'multiplier': 0.5},
-            'DMS': {'name': 'Dismissed', 'multiplier': 0.4}
-        }
+        return EVENT_SUBCATEGORIES
     
-    # ==================== SEARCH QUERY BUILDERS ====================
+    # ==================== BATCH SCORING ====================
     
-    def build_entity_search_query(self, entity_type='individual', search_term=None, filters=None):
-        """Build proper JOIN query for entity search"""
+    def score_events(self, cat_codes: Sequence[str], sub_codes: Sequence[str]):
+        """Risk score x sub-category multiplier for parallel sequences of event codes.
         
-        base_table = f"{entity_type}_mapping"
-        events_table = f"{entity_type}_events"
-        attributes_table = f"{entity_type}_attributes"
-        addresses_table = f"{entity_type}_addresses"
-        aliases_table = f"{entity_type}_aliases"
-        
-        query = f"""
-        SELECT DISTINCT
-            e.entity_id,
-            e.entity_name,
-            e.risk_id,
-            e.recordDefinitionType,
-            e.systemId,
-            e.entityDate,
-            
-            -- Aggregate events
-            COLLECT_LIST(STRUCT(
-                ev.event_category_code,
-                ev.event_sub_category_code, 
-                ev.event_date,
-                ev.event_description
-            )) as events,
-            
-            -- Aggregate PEP attributes
-            COLLECT_LIST(CASE 
-                WHEN attr.alias_code_type = 'PTY' THEN attr.alias_value 
-            END) as pep_types,
-            
-            -- Aggregate addresses
-            COLLECT_LIST(STRUCT(
-                addr.address_country,
-                addr.address_city,
-                addr.address_type
-            )) as addresses,
-            
-            -- Aggregate aliases
-            COLLECT_LIST(alias.alias_name) as aliases
-            
-        FROM {self.tables[base_table]} e
-        LEFT JOIN {self.tables[events_table]} ev ON e.entity_id = ev.entity_id
-        LEFT JOIN {self.tables[attributes_table]} attr ON e.entity_id = attr.entity_id  
-        LEFT JOIN {self.tables[addresses_table]} addr ON e.entity_id = addr.entity_id
-        LEFT JOIN {self.tables[aliases_table]} alias ON e.entity_id = alias.entity_id
+        Unknown categories score 0 and unknown sub-categories multiply by 1.0.
+        Returns a float32 array when NumPy is available, otherwise a list.
         """
+        n_cat, n_sub = len(CODE_TO_IDX), len(SUB_CODE_TO_IDX)
+        if not NUMPY_AVAILABLE:
+            return [
+                (EVENT_CATEGORIES[cat]['risk_score'] if cat in CODE_TO_IDX else 0)
+                * (EVENT_SUBCATEGORIES[sub]['multiplier'] if sub in SUB_CODE_TO_IDX else 1.0)
+                for cat, sub in zip(cat_codes, sub_codes)
+            ]
         
-        # Add WHERE conditions
-        conditions = []
-        
-        if search_term:
-            conditions.append(f"""
-            (UPPER(e.entity_name) LIKE UPPER('%{search_term}%')
-             OR UPPER(alias.alias_name) LIKE UPPER('%{search_term}%'))
-            """)
-        
-        if filters:
-            if filters.get('countries'):
-                countries = "','".join(filters['countries'])
-                conditions.append(f"addr.address_country IN ('{countries}')")
-                
-            if filters.get('event_categories'):
-                events = "','".join(filters['event_categories']) 
-                conditions.append(f"ev.event_category_code IN ('{events}')")
-                
-            if filters.get('pep_types'):
-                pep_conditions = []
-                for pep_type in filters['pep_types']:
-                    pep_conditions.append(f"attr.alias_value LIKE '{pep_type}%'")
-                conditions.append(f"({' OR '.join(pep_conditions)})")
+        cat_idx = np.fromiter((CODE_TO_IDX.get(code, n_cat) for code in cat_codes), dtype=np.intp, count=len(cat_codes))
+        sub_idx = np.fromiter((SUB_CODE_TO_IDX.get(code, n_sub) for code in sub_codes), dtype=np.intp, count=len(sub_codes))
+        return RISK_SCORE_TABLE[cat_idx] * MULTIPLIER_TABLE[sub_idx]
+    
+    # ==================== SEARCH QUERY BUILDERS ====================
+    
+    @staticmethod
+    def _sql_in_list(codes: Iterable[str]) -> str:
+        """Quoted, sorted literal list of known codes for an IN (...) clause"""
+        return ", ".join(f"'{code}'" for code in sorted(codes))
+    
+    @staticmethod
+    def _placeholders(prefix: str, count: int) -> str:
+        """Placeholder list for the parameters bound as prefix_0 .. prefix_<count-1>"""
+        return ", ".join(f"%({prefix}_{i})s" for i in range(count))
+    
+    @staticmethod
+    def _compile_query(select: str, joins: str, order_by: str) -> Tuple[str, str]:
+        """Split a query into the static text before and after its WHERE clause.
         
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
+        No DISTINCT: child tables are joined as per-entity subqueries, so rows are
+        already one per entity, and the ORDER BY ranks on columns not selected.
+        """
+        head = f"""
+        SELECT
+{select}
             
-        query += """
-        GROUP BY e.entity_id, e.entity_name, e.risk_id, e.recordDefinitionType, e.systemId, e.entityDate
+{joins}
+        """
+        tail = f"""
         ORDER BY 
-            COUNT(CASE WHEN ev.event_category_code IN ('TER', 'WLT', 'DEN', 'DTF', 'BRB', 'MLA') THEN 1 END) DESC,
-            COUNT(CASE WHEN attr.alias_code_type = 'PTY' THEN 1 END) DESC,
-            e.entity_name
+{order_by}
         """
-        
-        return query
+        return head, tail
+    
+    @staticmethod
+    def _assemble(skeleton: Tuple[str, str], conditions: List[str]) -> str:
+        """Fill a compiled skeleton with the per-call WHERE conditions"""
+        head, tail = skeleton
+        if conditions:
+            return head + " WHERE " + " AND ".join(conditions) + tail
+        return head + tail
     
-    def build_comprehensive_entity_query(self, name_filters: Dict):
-        """Comprehensive query to find entities using all available data"""
+    def _rank_joins(self, entity_type: str, event_codes_sql: str) -> str:
+        """Per-entity ranking counts, each aggregated in its own subquery"""
+        tables = self.tables
         return f"""
-        SELECT DISTINCT
-            e.entity_id,
+        LEFT JOIN (
+            SELECT entity_id, SUM(CASE WHEN event_category_code IN ({event_codes_sql}) THEN 1 ELSE 0 END) AS n_ranked_events
+            FROM {tables[f'{entity_type}_events']}
+            GROUP BY entity_id
+        ) ev_rank ON e.entity_id = ev_rank.entity_id
+        LEFT JOIN (
+            SELECT entity_id, COUNT(*) AS n_pep
+            FROM {tables[f'{entity_type}_attributes']}
+            WHERE alias_code_type = 'PTY'
+            GROUP BY entity_id
+        ) pep_rank ON e.entity_id = pep_rank.entity_id"""
+    
+    def _compile_search_skeleton(self, entity_type: str, aggregates: Tuple[str, ...]) -> Tuple[str, str]:
+        """Static parts of build_entity_search_query for one entity type and projection"""
+        tables = self.tables
+        select = """            e.entity_id,
+            e.entity_name,
+            e.risk_id,
+            e.recordDefinitionType,
+            e.systemId,
+            e.entityDate"""
+        join_sql = f"        FROM {tables[f'{entity_type}_mapping']} e"
+        for name in aggregates:
+            suffix, subquery = self._SEARCH_AGGREGATES[name]
+            select += f",\n            {name}_agg.{name}"
+            join_sql += (f"\n        LEFT JOIN ({subquery.format(table=tables[f'{entity_type}_{suffix}'])}"
+                         f"\n        ) {name}_agg ON e.entity_id = {name}_agg.entity_id")
+        join_sql += self._rank_joins(entity_type, self._critical_events_sql)
+        
+        return self._compile_query(
+            select=select,
+            joins=join_sql,
+            order_by="""            COALESCE(ev_rank.n_ranked_events, 0) DESC,
+            COALESCE(pep_rank.n_pep, 0) DESC,
+            e.entity_name"""
+        )
+    
+    def _search_skeleton(self, entity_type: str, aggregates: Tuple[str, ...]) -> Tuple[str, str]:
+        """Compiled search skeleton for a projection, built on first use"""
+        key = (entity_type, aggregates)
+        skeleton = self._search_skeletons.get(key)
+        if skeleton is None:
+            skeleton = self._search_skeletons[key] = self._compile_search_skeleton(entity_type, aggregates)
+        return skeleton
+    
+    def _compile_comprehensive_skeleton(self) -> Tuple[str, str]:
+        """Static parts of build_comprehensive_entity_query"""
+        tables = self.tables
+        return self._compile_query(
+            select="""            e.entity_id,
             e.entity_name,
             e.risk_id,
             om.bvdid,
             om.riskid as orbis_risk_id,
             
             -- All PEP classifications
-            COLLECT_LIST(CASE WHEN attr.alias_code_type = 'PTY' THEN attr.alias_value END) as pep_classifications,
+            pep.pep_classifications,
             
             -- All criminal/risk events
-            COLLECT_LIST(STRUCT(
-                ev.event_category_code,
-                ev.event_sub_category_code,
-                ev.event_description,
-                ev.event_date
-            )) as risk_events,
+            evs.risk_events,
             
             -- All addresses
-            COLLECT_LIST(STRUCT(
-                addr.address_country,
-                addr.address_city,
-                addr.address_type,
-                addr.address_raw_format
-            )) as addresses,
+            addrs.addresses,
             
             -- Birth information
             dob.date_of_birth_year,
@@ -406,32 +571,205 @@ class CorrectedDatabaseConfig:
             dob.date_of_birth_day,
             
             -- Sources
-            COLLECT_LIST(src.name) as source_names
-            
-        FROM {self.tables['individual_mapping']} e
-        LEFT JOIN {self.tables['grid_orbis_mapping']} om ON e.entity_id = om.entityid
-        LEFT JOIN {self.tables['individual_attributes']} attr ON e.entity_id = attr.entity_id
-        LEFT JOIN {self.tables['individual_events']} ev ON e.entity_id = ev.entity_id  
-        LEFT JOIN {self.tables['individual_addresses']} addr ON e.entity_id = addr.entity_id
-        LEFT JOIN {self.tables['individual_date_of_births']} dob ON e.entity_id = dob.entity_id
-        LEFT JOIN {self.tables['sources']} src ON e.entity_id = src.entity_id
-        
-        WHERE (
-            -- Name variations - dynamic based on input
-            {' OR '.join([f"UPPER(e.entity_name) LIKE UPPER('%{name}%')" for name in name_filters.get('names', [])])}
-            {' OR ' if name_filters.get('names') and name_filters.get('orbis_names') else ''}
-            {' OR '.join([f"UPPER(om.entityname) LIKE UPPER('%{name}%')" for name in name_filters.get('orbis_names', [])])}
+            srcs.source_names""",
+            joins=f"""        FROM {tables['individual_mapping']} e
+        LEFT JOIN {tables['grid_orbis_mapping']} om ON e.entity_id = om.entityid
+        LEFT JOIN {tables['individual_date_of_births']} dob ON e.entity_id = dob.entity_id
+        LEFT JOIN (
+            SELECT entity_id, COLLECT_SET(alias_value) AS pep_classifications
+            FROM {tables['individual_attributes']}
+            WHERE alias_code_type = 'PTY'
+            GROUP BY entity_id
+        ) pep ON e.entity_id = pep.entity_id
+        LEFT JOIN (
+            SELECT entity_id, COLLECT_LIST(STRUCT(
+                event_category_code,
+                event_sub_category_code,
+                event_description,
+                event_date
+            )) AS risk_events
+            FROM {tables['individual_events']}
+            GROUP BY entity_id
+        ) evs ON e.entity_id = evs.entity_id
+        LEFT JOIN (
+            SELECT entity_id, COLLECT_SET(STRUCT(
+                address_country,
+                address_city,
+                address_type,
+                address_raw_format
+            )) AS addresses
+            FROM {tables['individual_addresses']}
+            GROUP BY entity_id
+        ) addrs ON e.entity_id = addrs.entity_id
+        LEFT JOIN (
+            SELECT entity_id, COLLECT_SET(name) AS source_names
+            FROM {tables['sources']}
+            GROUP BY entity_id
+        ) srcs ON e.entity_id = srcs.entity_id""" + self._rank_joins('individual', self._comprehensive_rank_events_sql),
+            order_by="""            COALESCE(pep_rank.n_pep, 0) DESC,
+            COALESCE(ev_rank.n_ranked_events, 0) DESC,
+            e.entity_name"""
         )
-        {f"AND ({' OR '.join(name_filters.get('additional_filters', []))})" if name_filters.get('additional_filters') else ''}
+    
+    def _build_search_sql(self, entity_type: str, has_search: bool, n_countries: int,
+                          n_events: Optional[int], n_pep_types: Optional[int],
+                          aggregates: Tuple[str, ...]) -> str:
+        """SQL text of an entity search, which depends only on the shape of its inputs.
         
-        GROUP BY e.entity_id, e.entity_name, e.risk_id, om.bvdid, om.riskid,
-                 dob.date_of_birth_year, dob.date_of_birth_month, dob.date_of_birth_day
+        n_events / n_pep_types are None without that filter and 0 when none of the given
+        codes is valid, in which case the filter cannot match and becomes FALSE.
+        """
+        tables = self.tables
+        conditions = []
         
-        ORDER BY 
-            COUNT(CASE WHEN attr.alias_code_type = 'PTY' THEN 1 END) DESC,
-            COUNT(CASE WHEN ev.event_category_code IN ('BRB', 'PEP', 'MLA') THEN 1 END) DESC,
-            e.entity_name
+        # Filters on child tables are semi-joins, so they select entities without
+        # trimming or multiplying the aggregated columns
+        if has_search:
+            conditions.append(f"""
+            (UPPER(e.entity_name) LIKE UPPER(%(search_pattern)s)
+             OR EXISTS (SELECT 1 FROM {tables[f'{entity_type}_aliases']} alias
+                        WHERE alias.entity_id = e.entity_id
+                          AND UPPER(alias.alias_name) LIKE UPPER(%(search_pattern)s)))
+            """)
+        
+        if n_countries:
+            conditions.append(f"""EXISTS (SELECT 1 FROM {tables[f'{entity_type}_addresses']} addr
+                        WHERE addr.entity_id = e.entity_id
+                          AND addr.address_country IN ({self._placeholders('country', n_countries)}))""")
+        
+        if n_events is not None:
+            if n_events == len(self._valid_event_codes):
+                # Every known code: the precomputed literal list, nothing bound
+                event_codes = self._all_events_sql
+            else:
+                event_codes = self._placeholders('event_category', n_events)
+            conditions.append(f"""EXISTS (SELECT 1 FROM {tables[f'{entity_type}_events']} ev
+                        WHERE ev.entity_id = e.entity_id
+                          AND ev.event_category_code IN ({event_codes}))""" if n_events else "FALSE")
+        
+        if n_pep_types is not None:
+            pep_conditions = [f"attr.alias_value LIKE %(pep_type_{i})s" for i in range(n_pep_types)]
+            conditions.append(f"""EXISTS (SELECT 1 FROM {tables[f'{entity_type}_attributes']} attr
+                        WHERE attr.entity_id = e.entity_id
+                          AND ({' OR '.join(pep_conditions)}))""" if pep_conditions else "FALSE")
+        
+        return self._assemble(self._search_skeleton(entity_type, aggregates), conditions)
+    
+    def build_entity_search_query(self, entity_type='individual', search_term=None, filters=None,
+                                  projection: Optional[Set[str]] = None) -> QueryPlan:
+        """Build proper JOIN query for entity search.
+        
+        projection names the aggregate columns to return (events, pep_types, addresses,
+        aliases); None returns all of them. Entity columns are always returned, and child
+        tables that are not projected are not joined. Filters select entities and do not
+        trim the aggregated lists.
         """
+        params: Dict[str, Any] = {}
+        filters = filters or {}
+        
+        if search_term:
+            params['search_pattern'] = f"%{search_term}%"
+        
+        # Filter values are bound as parameters, so the query text only depends on
+        # how many values are given and the warehouse can reuse its plan. Values are
+        # de-duplicated and sorted, so the same filter in any order binds identically
+        countries = sorted(set(filters.get('countries') or ()))
+        for i, country in enumerate(countries):
+            params[f"country_{i}"] = country
+        
+        # Codes outside the known vocabulary are dropped before binding
+        n_events = None
+        if filters.get('event_categories'):
+            valid_events = sorted(set(filters['event_categories']) & self._valid_event_codes)
+            if len(valid_events) < len(self._valid_event_codes):
+                for i, code in enumerate(valid_events):
+                    params[f"event_category_{i}"] = code
+            n_events = len(valid_events)
+        
+        n_pep_types = None
+        if filters.get('pep_types'):
+            valid_pep_types = sorted(set(filters['pep_types']) & self._valid_pep_types)
+            for i, pep_type in enumerate(valid_pep_types):
+                params[f"pep_type_{i}"] = f"{pep_type}%"
+            n_pep_types = len(valid_pep_types)
+        
+        aggregates = tuple(name for name in self._SEARCH_AGGREGATES if projection is None or name in projection)
+        query = self._search_sql(entity_type, bool(search_term), len(countries), n_events, n_pep_types, aggregates)
+        return QueryPlan(query, params, fetch_size=1000)
+    
+    def build_batch_entity_search(self, search_terms: Sequence[str],
+                                  entity_type='individual') -> QueryPlan:
+        """One query matching several names at once.
+        
+        Each result row carries the search term it matched, so callers can split the
+        rows per term instead of issuing one query per name. Matches entity names only.
+        Raises ValueError when no search terms are given.
+        """
+        terms = sorted(set(search_terms))
+        if not terms:
+            raise ValueError("build_batch_entity_search needs at least one search term")
+        
+        params: Dict[str, Any] = {}
+        rows = []
+        for i, term in enumerate(terms):
+            params[f"term_{i}"] = term
+            params[f"pattern_{i}"] = f"%{term}%"
+            rows.append(f"(%(term_{i})s, %(pattern_{i})s)")
+        
+        query = f"""
+        WITH q(term, pattern) AS (VALUES {', '.join(rows)})
+        SELECT DISTINCT
+            q.term,
+            e.entity_id,
+            e.entity_name,
+            e.risk_id,
+            e.recordDefinitionType,
+            e.systemId,
+            e.entityDate
+        FROM q
+        JOIN {self.tables[f"{entity_type}_mapping"]} e ON UPPER(e.entity_name) LIKE UPPER(q.pattern)
+        ORDER BY q.term, e.entity_name
+        """
+        return QueryPlan(query, params, fetch_size=1000)
+    
+    @staticmethod
+    def _name_alternation(names: Iterable[str]) -> str:
+        """Upper-cased, regex-escaped names joined into one RLIKE alternation, in canonical order"""
+        return "|".join(sorted({re.escape(name.upper()) for name in names}))
+    
+    def build_comprehensive_entity_query(self, name_filters: Dict) -> QueryPlan:
+        """Comprehensive query to find entities using all available data.
+        
+        'additional_filters' entries are SQL fragments and are inserted as-is; they can
+        reference e (mapping), om (ORBIS mapping) and dob, but not the child tables, which
+        are aggregated in subqueries.
+        """
+        params: Dict[str, Any] = {}
+        name_conditions = []
+        # All variations of a name column go into one regex alternation, so each row is
+        # scanned once instead of once per LIKE
+        if name_filters.get('names'):
+            params['names_pattern'] = self._name_alternation(name_filters['names'])
+            name_conditions.append("UPPER(e.entity_name) RLIKE %(names_pattern)s")
+        if name_filters.get('orbis_names'):
+            params['orbis_names_pattern'] = self._name_alternation(name_filters['orbis_names'])
+            name_conditions.append("UPPER(om.entityname) RLIKE %(orbis_names_pattern)s")
+        
+        # Name variations - dynamic based on input
+        conditions = []
+        if name_conditions:
+            conditions.append(f"({' OR '.join(name_conditions)})")
+        if name_filters.get('additional_filters'):
+            conditions.append(f"({' OR '.join(name_filters['additional_filters'])})")
+        
+        # Rows carry several aggregated lists each, so fetch in smaller batches
+        return QueryPlan(self._assemble(self._comprehensive_skeleton, conditions), params, fetch_size=500)
 
 # Global instance
-corrected_db_config = CorrectedDatabaseConfig()
\ No newline at end of file
+corrected_db_config = CorrectedDatabaseConfig()
+
+# Severity tiers as frozensets, so "is this code critical?" is a single hash lookup
+CRITICAL_CODES = frozenset(corrected_db_config.events_by_severity.get('critical', ()))
+HIGH_CODES = frozenset(corrected_db_config.events_by_severity.get('high', ()))
+MEDIUM_CODES = frozenset(corrected_db_config.events_by_severity.get('medium', ()))
+LOW_CODES = frozenset(corrected_db_config.events_by_severity.get('low', ()))
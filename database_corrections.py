@@ -10,18 +10,219 @@ This module provides corrected database query methods that understand the actual
 - Enhanced boolean search with proper PEP filtering
 """
 
+import re
 import logging
+import itertools
+import concurrent.futures
+import functools
+from operator import itemgetter
 import json
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator
 from datetime import datetime
 import ast
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Entity types whose search scaffolding is rendered at construction
+ENTITY_TYPES = ('individual', 'organization')
+
+# Rows per Arrow batch when streaming results from the warehouse
+ARROW_FETCH_SIZE = 10000
+
+# Export summary columns, in output order
+EXPORT_COLUMNS = (
+    'Entity_ID', 'Risk_ID', 'Entity_Name', 'Entity_Type',
+    'Is_PEP', 'PEP_Type', 'PEP_Level', 'PEP_Description', 'PEP_Associations',
+    'Risk_Score', 'Risk_Category', 'Birth_Year', 'BVD_ID', 'Source_ID', 'System_ID', 'Entity_Date',
+)
+
+# Raw-row, PEP and risk fields feeding the export summary
+_RESULT_EXPORT_KEYS = (
+    'entity_id', 'risk_id', 'entity_name', 'recordDefinitionType', 'date_of_birth_year',
+    'bvdid', 'source_item_id', 'systemId', 'entityDate',
+)
+_RESULT_EXPORT_GETTER = itemgetter(*_RESULT_EXPORT_KEYS)
+_PEP_EXPORT_GETTER = itemgetter('is_pep', 'pep_type', 'pep_level', 'pep_description', 'pep_associations')
+_RISK_EXPORT_GETTER = itemgetter('risk_score', 'risk_category')
+
+# PTY value disposition in one anchored match: 'MUN:L3' style values (code
+# and level split on the first ':', both stripped), else relationship
+# descriptions; no match means a free-text association
+_PEP_DISPOSITION = re.compile(
+    r'(?P<coded>\s*(?P<code>[^:]*?)\s*:\s*(?P<level>.*?)\s*)\Z'
+    r'|(?P<related>.*?(?:Family Member of|Associate of))',
+    re.DOTALL
+)
+
+def _apply_coded_pep(pep_info: Dict, value: str, match, pep_types: Dict[str, str]) -> None:
+    # Format: 'MUN:L3', 'REG:L5'; unknown codes are ignored
+    pep_code = match.group('code')
+    if pep_code in pep_types:
+        pep_info['pep_type'] = pep_code
+        pep_info['pep_level'] = match.group('level')
+        pep_info['pep_description'] = pep_types[pep_code]
+
+def _apply_related_pep(pep_info: Dict, value: str, match, pep_types: Dict[str, str]) -> None:
+    # 'Family Member of ...' / 'Associate of ...'
+    pep_info['pep_associations'].append(value)
+    if 'Family' in value:
+        pep_info['pep_type'] = 'FAM'
+        pep_info['pep_description'] = 'Family Member'
+    else:
+        pep_info['pep_type'] = 'ASC'
+        pep_info['pep_description'] = 'Close Associate'
+
+def _apply_other_pep(pep_info: Dict, value: str, match, pep_types: Dict[str, str]) -> None:
+    # Other relationship or description
+    pep_info['pep_associations'].append(value)
+
+# Disposition (match.lastgroup, None when unmatched) -> handler
+_PEP_HANDLERS = {
+    'coded': _apply_coded_pep,
+    'related': _apply_related_pep,
+    None: _apply_other_pep,
+}
+
+# Boolean search tokens: parentheses, AND/OR/NOT, and FIELD:value leaves whose
+# value is quoted or runs up to the next parenthesis or operator
+_BOOLEAN_TOKEN = re.compile(
+    r'\s*(?:(?P<paren>[()])'
+    r'|(?P<op>AND|OR|NOT)(?![^\s()])'
+    r'|(?P<field>[A-Za-z_]+)\s*:\s*(?P<value>"[^"]*"|(?:(?!\s+(?:AND|OR|NOT)(?![^\s()]))[^()])+))'
+)
+
+# Operator binding strength for the boolean parser
+_BOOLEAN_PRECEDENCE = {'OR': 1, 'AND': 2, 'NOT': 3}
+
+def _decode_json_list(value: Any) -> Any:
+    """Decode a JSON-encoded list column; driver-native lists pass straight through"""
+    if not isinstance(value, (str, bytes)):
+        return value
+    try:
+        return orjson.loads(value) if ORJSON_AVAILABLE else json.loads(value)
+    except ValueError:
+        return []
+
+# Event codes are three uppercase letters: packed base-26 they index flat
+# tables directly; anything else lands on the trailing default slot
+PACKED_DEFAULT = 26 ** 3
+
+def _pack3(code: Any) -> int:
+    """Base-26 index of a 3-letter uppercase code, PACKED_DEFAULT otherwise"""
+    if isinstance(code, str) and len(code) == 3 and code.isascii() and code.isalpha() and code.isupper():
+        return (ord(code[0]) - 65) * 676 + (ord(code[1]) - 65) * 26 + (ord(code[2]) - 65)
+    return PACKED_DEFAULT
+
+if NUMPY_AVAILABLE:
+    _PACK_WEIGHTS = np.array([676, 26, 1], dtype=np.int32)
+
+def _pack_codes(codes: List) -> 'np.ndarray':
+    """Vectorized _pack3 over a list of codes"""
+    chars = np.array(codes, dtype=str)
+    if chars.dtype.itemsize != 12:
+        # Some code is not exactly three characters (or not a string)
+        return np.fromiter((_pack3(code) for code in codes), dtype=np.int32, count=len(codes))
+    letters = chars.view(np.uint32).reshape(-1, 3).astype(np.int32) - 65
+    valid = ((letters >= 0) & (letters < 26)).all(axis=1)
+    return np.where(valid, letters @ _PACK_WEIGHTS, PACKED_DEFAULT).astype(np.int32)
+
+def _build_code_table(mapping: Dict[str, Any], default: Any, dtype) -> 'np.ndarray':
+    """Flat lookup table indexed by packed code"""
+    table = np.full(PACKED_DEFAULT + 1, default, dtype=dtype)
+    for code, value in mapping.items():
+        packed = _pack3(code)
+        if packed != PACKED_DEFAULT:
+            table[packed] = value
+    return table
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True)
+    def _risk_kernel(category_ids, sub_category_ids, risk_table, modifier_table):
+        """Per-event base/modifier/final scores and their maximum for one entity"""
+        n = category_ids.shape[0]
+        base = np.empty(n, dtype=np.int64)
+        modifier = np.empty(n, dtype=np.float64)
+        final = np.empty(n, dtype=np.int64)
+        max_score = 0
+        for i in range(n):
+            base[i] = risk_table[category_ids[i]]
+            modifier[i] = modifier_table[sub_category_ids[i]]
+            final[i] = min(int(base[i] * modifier[i]), 100)
+            if final[i] > max_score:
+                max_score = final[i]
+        return max_score, base, modifier, final
+
 class DatabaseCorrections:
     """Corrected database methods to replace incorrect logic in main.py"""
     
-    def __init__(self):
+    # Per-entity pre-aggregates (alias -> CTE name, body), each joined once in
+    # place of repeated EXISTS probes against the same child table
+    _FLAG_CTES = {
+        'ef': ('entity_flags', """
+            SELECT entity_id, COLLECT_SET(alias_value) AS pep_values
+            FROM prd_bronze_catalog.grid.{entity_type}_attributes
+            WHERE alias_code_type = 'PTY'
+            GROUP BY entity_id"""),
+        'evf': ('event_flags', """
+            SELECT entity_id, COLLECT_SET(event_category_code) AS event_codes
+            FROM prd_bronze_catalog.grid.{entity_type}_events
+            GROUP BY entity_id"""),
+        'adf': ('address_flags', """
+            SELECT entity_id, COLLECT_SET(LOWER(address_country)) AS countries
+            FROM prd_bronze_catalog.grid.{entity_type}_addresses
+            GROUP BY entity_id"""),
+    }
+    
+    # Boolean leaf field -> (predicate, flag CTE alias, parameter format);
+    # flag predicates are NULL-safe so NOT behaves for entities without rows
+    _BOOLEAN_FIELDS = {
+        'PEP_TYPE': ("COALESCE(EXISTS(ef.pep_values, v -> v LIKE ?), FALSE)", 'ef', '%{}%'),
+        'RISK_CATEGORY': ("COALESCE(array_contains(evf.event_codes, ?), FALSE)", 'evf', '{}'),
+        'COUNTRY': ("COALESCE(array_contains(adf.countries, LOWER(?)), FALSE)", 'adf', '{}'),
+        'NAME': ("LOWER(m.entity_name) LIKE LOWER(?)", None, '%{}%'),
+    }
+    
+    # Top-level AND leaves answered by matching_entities instead:
+    # field -> (child table, row pre-filter, row predicate, parameter format)
+    _SEMI_JOIN_LEAVES = {
+        'PEP_TYPE': ('attributes', "alias_code_type = 'PTY'", "alias_value LIKE ?", '%{}%'),
+        'RISK_CATEGORY': ('events', None, "event_category_code = ?", '{}'),
+        'COUNTRY': ('addresses', None, "LOWER(address_country) = LOWER(?)", '{}'),
+    }
+    
+    # Rows handed to the worker pool at a time; bounds memory when streaming
+    PARALLEL_BATCH_SIZE = 2048
+    
+    def __init__(self, max_workers: int = 1):
+        # Threads for process_corrected_results; only worth raising when the
+        # GIL-free Numba scoring dominates (or on a free-threaded interpreter)
+        self.max_workers = max_workers
+        
         # Correct PEP type mappings based on datareq.txt and res2.txt
         self.pep_types = {
             'HOS': 'Head of State',
@@ -75,6 +276,95 @@ class DatabaseCorrections:
             'ALL': 0.6,  # Alleged
             'ASC': 0.5   # Associated
         }
+        
+        # Packed-code lookup tables (defaults in unused slots) for event scoring
+        if NUMPY_AVAILABLE:
+            self._risk_by_code = _build_code_table(self.event_risk_scores, 10, np.int16)
+            # Modifiers stay float64 so scores match int(base * modifier) exactly
+            self._modifier_by_code = _build_code_table(self.sub_category_modifiers, 1.0, np.float64)
+        
+        # Same scoring evaluated in the warehouse; DOUBLE modifiers (not DECIMAL)
+        # so the truncation matches int(base * modifier). Inlined as map
+        # literals until register_lookup_views() switches to joined views
+        self._risk_score_sql = self._risk_score_expression(
+            f"{self._sql_map(self.event_risk_scores)}[ev.event_category_code]",
+            f"{self._sql_map(self.sub_category_modifiers, '{!r}D')}[ev.event_sub_category_code]"
+        )
+        self._risk_joins = ''
+        
+        # Search SQL keyed by filter shape; values travel as parameters, so
+        # repeated shapes reuse the same text (and the warehouse's plan)
+        self._search_template = functools.lru_cache(maxsize=256)(self._render_search_query)
+        
+        # Entity-type scaffolding rendered once; only the WHERE/ORDER BY/LIMIT
+        # tail and the shape-dependent fragments vary per query
+        self._render_base_templates()
+
+    def _render_base_templates(self) -> None:
+        """(Re)build the per-entity-type scaffolding and drop cached search SQL"""
+        self._base_templates = {
+            entity_type: self._render_base_template(entity_type)
+            for entity_type in ENTITY_TYPES
+        }
+        self._search_template.cache_clear()
+
+    @staticmethod
+    def _risk_score_expression(base_sql: str, modifier_sql: str) -> str:
+        """Per-entity MAX of the capped event score, given base score and modifier lookups"""
+        return (
+            "MAX(CASE WHEN ev.event_category_code IS NOT NULL THEN LEAST(CAST("
+            f"COALESCE({base_sql}, 10) * COALESCE({modifier_sql}, 1.0D)"
+            " AS INT), 100) END)"
+        )
+
+    @staticmethod
+    def _sql_values_view(name: str, columns: Tuple[str, ...], rows: Iterable[Tuple[str, ...]]) -> str:
+        """CREATE TEMPORARY VIEW over inline VALUES rows (already SQL literals)"""
+        values = ', '.join(f"({', '.join(row)})" for row in rows)
+        return f"CREATE OR REPLACE TEMPORARY VIEW {name} AS SELECT * FROM VALUES {values} AS t({', '.join(columns)})"
+
+    def lookup_view_statements(self) -> List[str]:
+        """Statements creating the PEP type and risk scoring lookup views"""
+        return [
+            self._sql_values_view(
+                'pep_types', ('code', 'description'),
+                ((f"'{code}'", f"'{description}'") for code, description in self.pep_types.items())
+            ),
+            self._sql_values_view(
+                'event_risk_scores', ('code', 'risk_score'),
+                ((f"'{code}'", str(score)) for code, score in self.event_risk_scores.items())
+            ),
+            self._sql_values_view(
+                'sub_category_modifiers', ('code', 'modifier'),
+                ((f"'{code}'", f"{modifier!r}D") for code, modifier in self.sub_category_modifiers.items())
+            ),
+        ]
+
+    def register_lookup_views(self, cursor) -> None:
+        """
+        Create the lookup views in the cursor's session and score against them
+        
+        Search SQL built afterwards joins event_risk_scores and
+        sub_category_modifiers (small enough for the planner to broadcast)
+        instead of inlining the maps, so only run queries from this
+        instance on the same session.
+        """
+        for statement in self.lookup_view_statements():
+            cursor.execute(statement)
+        
+        self._risk_score_sql = self._risk_score_expression('rs.risk_score', 'scm.modifier')
+        self._risk_joins = (
+            "\n            LEFT JOIN event_risk_scores rs ON rs.code = ev.event_category_code"
+            "\n            LEFT JOIN sub_category_modifiers scm ON scm.code = ev.event_sub_category_code"
+        )
+        self._render_base_templates()
+
+    @staticmethod
+    def _sql_map(mapping: Dict[str, Any], value_format: str = '{}') -> str:
+        """Render a static code mapping as a Spark SQL map literal"""
+        keys = ', '.join(f"'{code}'" for code in mapping)
+        values = ', '.join(value_format.format(value) for value in mapping.values())
+        return f"map_from_arrays(array({keys}), array({values}))"
 
     def extract_correct_pep_info(self, attributes: List[Dict]) -> Dict[str, Any]:
         """
@@ -103,36 +393,15 @@ class DatabaseCorrections:
                 pep_info['is_pep'] = True
                 pep_info['pep_details'].append(value)
                 
-                # Parse different PEP value formats
-                if ':' in value:
-                    # Format: 'MUN:L3', 'REG:L5' 
-                    parts = value.split(':', 1)
-                    pep_code = parts[0].strip()
-                    level = parts[1].strip()
-                    
-                    if pep_code in self.pep_types:
-                        pep_info['pep_type'] = pep_code
-                        pep_info['pep_level'] = level
-                        pep_info['pep_description'] = self.pep_types[pep_code]
-                
-                elif value in self.pep_types:
-                    # Direct PEP code: 'FAM', 'ASC'
+                # Direct PEP code ('FAM', 'ASC'); codes never contain ':'
+                if value in self.pep_types:
                     pep_info['pep_type'] = value
                     pep_info['pep_description'] = self.pep_types[value]
-                    
-                elif 'Family Member of' in value or 'Associate of' in value:
-                    # Relationship descriptions
-                    pep_info['pep_associations'].append(value)
-                    if 'Family' in value:
-                        pep_info['pep_type'] = 'FAM'
-                        pep_info['pep_description'] = 'Family Member'
-                    elif 'Associate' in value:
-                        pep_info['pep_type'] = 'ASC'
-                        pep_info['pep_description'] = 'Close Associate'
+                    continue
                 
-                else:
-                    # Other relationship or description
-                    pep_info['pep_associations'].append(value)
+                # Parse the other PEP value formats via one classifier match
+                match = _PEP_DISPOSITION.match(value)
+                _PEP_HANDLERS[match.lastgroup if match else None](pep_info, value, match, self.pep_types)
         
         return pep_info
 
@@ -145,48 +414,132 @@ class DatabaseCorrections:
         if not events:
             return {'risk_score': 0, 'risk_category': 'Unknown', 'risk_details': []}
         
-        max_score = 0
-        risk_details = []
-        
-        for event in events:
-            category = event.get('event_category_code', '')
-            sub_category = event.get('event_sub_category_code', '')
-            
-            # Get base risk score
-            base_score = self.event_risk_scores.get(category, 10)
-            
-            # Apply sub-category modifier
-            modifier = self.sub_category_modifiers.get(sub_category, 1.0)
-            
-            # Calculate final score
-            event_score = min(int(base_score * modifier), 100)
-            max_score = max(max_score, event_score)
-            
-            risk_details.append({
-                'event_category': category,
-                'event_sub_category': sub_category,
-                'base_score': base_score,
-                'modifier': modifier,
-                'final_score': event_score
-            })
-        
-        # Determine risk category
-        if max_score >= 80:
-            risk_category = 'Critical'
-        elif max_score >= 60:
-            risk_category = 'Valuable'
-        elif max_score >= 40:
-            risk_category = 'Investigative'
+        if NUMPY_AVAILABLE:
+            max_score, risk_details = self._score_events_packed(events)
         else:
-            risk_category = 'Probative'
+            max_score = 0
+            risk_details = []
+            
+            for event in events:
+                category = event.get('event_category_code', '')
+                sub_category = event.get('event_sub_category_code', '')
+                
+                # Get base risk score
+                base_score = self.event_risk_scores.get(category, 10)
+                
+                # Apply sub-category modifier
+                modifier = self.sub_category_modifiers.get(sub_category, 1.0)
+                
+                # Calculate final score
+                event_score = min(int(base_score * modifier), 100)
+                max_score = max(max_score, event_score)
+                
+                risk_details.append({
+                    'event_category': category,
+                    'event_sub_category': sub_category,
+                    'base_score': base_score,
+                    'modifier': modifier,
+                    'final_score': event_score
+                })
         
         return {
             'risk_score': max_score,
-            'risk_category': risk_category,
+            'risk_category': self._risk_category(max_score),
             'risk_details': risk_details
         }
 
-    def build_corrected_search_query(self, entity_type: str, search_params: Dict) -> Tuple[str, List]:
+    @staticmethod
+    def _risk_category(score: int) -> str:
+        """Risk category for a final score"""
+        if score >= 80:
+            return 'Critical'
+        elif score >= 60:
+            return 'Valuable'
+        elif score >= 40:
+            return 'Investigative'
+        return 'Probative'
+
+    def _score_events_packed(self, events: List[Dict]) -> Tuple[int, List[Dict]]:
+        """Score events via the packed-code tables; same results as the Python loop"""
+        categories = [event.get('event_category_code', '') for event in events]
+        sub_categories = [event.get('event_sub_category_code', '') for event in events]
+        category_ids = _pack_codes(categories)
+        sub_category_ids = _pack_codes(sub_categories)
+        
+        if NUMBA_AVAILABLE:
+            max_score, base, modifier, final = _risk_kernel(
+                category_ids, sub_category_ids, self._risk_by_code, self._modifier_by_code
+            )
+        else:
+            base = self._risk_by_code[category_ids].astype(np.int64)
+            modifier = self._modifier_by_code[sub_category_ids]
+            final = np.minimum((base * modifier).astype(np.int64), 100)
+            max_score = final.max()
+        
+        risk_details = [
+            {
+                'event_category': category,
+                'event_sub_category': sub_category,
+                'base_score': base_score,
+                'modifier': event_modifier,
+                'final_score': event_score
+            }
+            for category, sub_category, base_score, event_modifier, event_score
+            in zip(categories, sub_categories, base.tolist(), modifier.tolist(), final.tolist())
+        ]
+        return int(max_score), risk_details
+
+    def _flag_sql(self, entity_type: str, aliases, semi_join_sql: Optional[str] = None) -> Tuple[str, str]:
+        """WITH clause and joins for the requested flag CTEs and matching_entities"""
+        ordered = [alias for alias in self._FLAG_CTES if alias in aliases]
+        ctes = [
+            f"{self._FLAG_CTES[alias][0]} AS ({self._FLAG_CTES[alias][1].format(entity_type=entity_type)})"
+            for alias in ordered
+        ]
+        joins = [
+            f"LEFT JOIN {self._FLAG_CTES[alias][0]} {alias} ON {alias}.entity_id = m.entity_id"
+            for alias in ordered
+        ]
+        # matching_entities goes first so its placeholders lead the parameter list
+        if semi_join_sql:
+            ctes.insert(0, f"matching_entities AS ({semi_join_sql})")
+            joins.insert(0, "JOIN matching_entities me ON me.entity_id = m.entity_id")
+        if not ctes:
+            return '', ''
+        return f"WITH {', '.join(ctes)}", '\n        '.join(joins)
+
+    def _semi_join_sql(self, entity_type: str, leaves: List[Dict]) -> Tuple[str, List]:
+        """
+        matching_entities body for ANDed PEP_TYPE/RISK_CATEGORY/COUNTRY leaves
+        
+        One aggregate per child table, intersected: rows are pre-filtered to
+        any leaf's match, and HAVING requires every leaf to match some row.
+        """
+        by_table: Dict[str, List] = {}
+        for leaf in leaves:
+            table, base_filter, predicate, param_format = self._SEMI_JOIN_LEAVES[leaf['field'].upper()]
+            by_table.setdefault(table, []).append((base_filter, predicate, param_format.format(leaf['value'])))
+        
+        legs = []
+        params = []
+        for table, table_leaves in by_table.items():
+            base_filter = table_leaves[0][0]
+            any_match = ' OR '.join(predicate for _, predicate, _ in table_leaves)
+            conditions = [base_filter, f"({any_match})"] if base_filter else [f"({any_match})"]
+            leg = (
+                f"SELECT entity_id FROM prd_bronze_catalog.grid.{entity_type}_{table} "
+                f"WHERE {' AND '.join(conditions)} GROUP BY entity_id"
+            )
+            params.extend(param for _, _, param in table_leaves)
+            if len(table_leaves) > 1:
+                leg += ' HAVING ' + ' AND '.join(f"BOOL_OR({predicate})" for _, predicate, _ in table_leaves)
+                params.extend(param for _, _, param in table_leaves)
+            legs.append(leg)
+        
+        return ' INTERSECT '.join(legs), params
+
+    def build_corrected_search_query(self, entity_type: str, search_params: Dict, flags=(),
+                                     extra_predicates=(), semi_join: Optional[Tuple[str, List]] = None) -> Tuple[str, List]:
         """
         Build CORRECTED database query with proper table usage and joins
         
@@ -195,11 +548,71 @@ class DatabaseCorrections:
         2. Correct use of individual_date_of_births table
         3. Proper event filtering with category codes
         4. Enhanced boolean search support
+        
+        flags names extra flag CTE aliases (see _FLAG_CTES) referenced by
+        extra_predicates, a sequence of (sql, params) ANDed into the WHERE;
+        semi_join is a (sql, params) matching_entities body inner-joined on entity_id.
+        """
+        pep_types = search_params.get('pep_types') or []
+        if isinstance(pep_types, str):
+            pep_types = [pep_types]
+        categories = search_params.get('event_categories') or []
+        if isinstance(categories, str):
+            categories = [categories]
+        birth_year = search_params.get('birth_year') if entity_type == 'individual' else None
+        
+        # Parameters in the order the template's placeholders appear: event
+        # and address aggregates first, then the outer WHERE
+        query_params = list(semi_join[1]) if semi_join else []
+        query_params.extend(categories)
+        if search_params.get('event_date_from'):
+            query_params.append(search_params['event_date_from'])
+        if search_params.get('event_date_to'):
+            query_params.append(search_params['event_date_to'])
+        if search_params.get('country'):
+            query_params.append(search_params['country'])
+        if search_params.get('name'):
+            query_params.append(f"%{search_params['name']}%")
+        if pep_types:
+            query_params.append(self._pep_type_pattern(pep_types))
+        if birth_year:
+            query_params.append(str(birth_year))
+        for _, predicate_params in extra_predicates:
+            query_params.extend(predicate_params)
+        
+        # SQL text depends only on which filters are active, not their values
+        shape = (
+            bool(search_params.get('name')),
+            bool(search_params.get('pep_only')),
+            bool(pep_types),
+            bool(search_params.get('country')),
+            len(categories),
+            bool(birth_year),
+            bool(search_params.get('event_date_from')),
+            bool(search_params.get('event_date_to')),
+        )
+        query = self._search_template(
+            entity_type, shape, search_params.get('limit', 100), frozenset(flags),
+            tuple(predicate for predicate, _ in extra_predicates), semi_join[0] if semi_join else None
+        )
+        return query, query_params
+
+    @staticmethod
+    def _pep_type_pattern(pep_types: List[str]) -> str:
+        """Regex-escaped PEP types joined into one RLIKE alternation, in canonical order"""
+        return '|'.join(sorted({re.escape(str(pep_type)) for pep_type in pep_types}))
+
+    def _render_base_template(self, entity_type: str) -> str:
         """
+        SELECT/JOIN scaffolding for one entity type, up to the WHERE clause
         
-        # Base query with all necessary joins
-        base_query = f"""
-        SELECT DISTINCT
+        Leaves {with_clause}, {event_where}, {address_where} and {flag_joins}
+        as str.format fields for _render_search_query to fill per shape.
+        """
+        # Base query: each child table is aggregated to one row per entity
+        # before joining, so the lists are not multiplied by each other
+        return f"""{{with_clause}}
+        SELECT
             m.entity_id,
             m.risk_id,
             m.entity_name,
@@ -208,36 +621,10 @@ class DatabaseCorrections:
             m.systemId,
             m.entityDate,
             
-            -- Collect all attributes (including PEP data)
-            COLLECT_LIST(
-                CASE WHEN attr.alias_code_type IS NOT NULL 
-                THEN STRUCT(attr.alias_code_type, attr.alias_value)
-                END
-            ) as attributes,
-            
-            -- Collect all events
-            COLLECT_LIST(
-                CASE WHEN ev.event_category_code IS NOT NULL
-                THEN STRUCT(
-                    ev.event_category_code,
-                    ev.event_sub_category_code,
-                    ev.event_date,
-                    ev.event_description
-                )
-                END
-            ) as events,
-            
-            -- Collect addresses
-            COLLECT_LIST(
-                CASE WHEN addr.address_id IS NOT NULL
-                THEN STRUCT(
-                    addr.address_country,
-                    addr.address_city,
-                    addr.address_type,
-                    addr.address_line1
-                )
-                END
-            ) as addresses,
+            -- All attributes (including PEP data), events and addresses
+            COALESCE(a.attributes, array()) as attributes,
+            COALESCE(e.events, array()) as events,
+            COALESCE(ad.addresses, array()) as addresses,
             
             -- Date of birth info (CORRECTED: Use individual_date_of_births table)
             dob.date_of_birth_year,
@@ -247,21 +634,52 @@ class DatabaseCorrections:
             
             -- BVD mapping
             bvd.bvdid,
-            bvd.entitytype as bvd_entity_type
+            bvd.entitytype as bvd_entity_type,
+            
+            -- Derived in the warehouse so processing can skip client-side scoring
+            COALESCE(a.is_pep, 0) as is_pep,
+            e.risk_score
             
         FROM prd_bronze_catalog.grid.{entity_type}_mapping m
         
-        -- CORRECTED: Proper attributes join for PEP data
-        LEFT JOIN prd_bronze_catalog.grid.{entity_type}_attributes attr 
-            ON m.entity_id = attr.entity_id
+        -- CORRECTED: Proper attributes aggregate for PEP data
+        LEFT JOIN (
+            SELECT attr.entity_id,
+                   COLLECT_LIST(STRUCT(attr.alias_code_type, attr.alias_value)) as attributes,
+                   MAX(CASE WHEN attr.alias_code_type = 'PTY' AND attr.alias_value <> '' THEN 1 ELSE 0 END) as is_pep
+            FROM prd_bronze_catalog.grid.{entity_type}_attributes attr
+            WHERE attr.alias_code_type IS NOT NULL
+            GROUP BY attr.entity_id
+        ) a ON a.entity_id = m.entity_id
         
-        -- Events join
-        LEFT JOIN prd_bronze_catalog.grid.{entity_type}_events ev 
-            ON m.entity_id = ev.entity_id
+        -- Events aggregate
+        LEFT JOIN (
+            SELECT ev.entity_id,
+                   COLLECT_LIST(STRUCT(
+                       ev.event_category_code,
+                       ev.event_sub_category_code,
+                       ev.event_date,
+                       ev.event_description
+                   )) as events,
+                   {self._risk_score_sql} as risk_score
+            FROM prd_bronze_catalog.grid.{entity_type}_events ev{self._risk_joins}
+            WHERE {{event_where}}
+            GROUP BY ev.entity_id
+        ) e ON e.entity_id = m.entity_id
             
-        -- Addresses join  
-        LEFT JOIN prd_bronze_catalog.grid.{entity_type}_addresses addr
-            ON m.entity_id = addr.entity_id
+        -- Addresses aggregate
+        LEFT JOIN (
+            SELECT addr.entity_id,
+                   COLLECT_LIST(STRUCT(
+                       addr.address_country,
+                       addr.address_city,
+                       addr.address_type,
+                       addr.address_line1
+                   )) as addresses
+            FROM prd_bronze_catalog.grid.{entity_type}_addresses addr
+            WHERE {{address_where}}
+            GROUP BY addr.entity_id
+        ) ad ON ad.entity_id = m.entity_id
             
         -- CORRECTED: Use individual_date_of_births table
         {f"LEFT JOIN prd_bronze_catalog.grid.individual_date_of_births dob ON m.entity_id = dob.entity_id" if entity_type == 'individual' else ""}
@@ -269,93 +687,89 @@ class DatabaseCorrections:
         -- BVD mapping
         LEFT JOIN prd_bronze_catalog.grid.grid_orbis_mapping bvd 
             ON m.risk_id = bvd.riskid
+        
+        -- Pre-aggregated flags for PEP/event/country filters
+        {{flag_joins}}
         """
+
+    def _base_template(self, entity_type: str) -> str:
+        """Precomputed scaffolding for known entity types, rendered on demand otherwise"""
+        template = self._base_templates.get(entity_type)
+        if template is None:
+            template = self._render_base_template(entity_type)
+        return template
+
+    def _render_search_query(self, entity_type: str, shape: Tuple, limit: int, flags: frozenset,
+                             extra_sql: Tuple[str, ...], semi_join_sql: Optional[str] = None) -> str:
+        """Render the search SQL for one filter shape; cached as _search_template"""
+        (has_name, pep_only, has_pep_types, has_country, category_count,
+         has_birth_year, has_date_from, has_date_to) = shape
+        
+        flags = set(flags)
+        if pep_only or has_pep_types:
+            flags.add('ef')
+        with_clause, flag_joins = self._flag_sql(entity_type, flags, semi_join_sql)
+        
+        # Event and country filters restrict the collected rows, so they are
+        # applied inside the per-table aggregates
+        event_conditions = ["ev.event_category_code IS NOT NULL"]
+        if category_count:
+            event_conditions.append(f"ev.event_category_code IN ({','.join(['?'] * category_count)})")
+        if has_date_from:
+            event_conditions.append("ev.event_date >= ?")
+        if has_date_to:
+            event_conditions.append("ev.event_date <= ?")
+        
+        address_conditions = ["addr.address_id IS NOT NULL"]
+        if has_country:
+            address_conditions.append("LOWER(addr.address_country) = LOWER(?)")
+        
+        # Base query: the per-type scaffolding with this shape's CTEs, aggregate
+        # filters and flag joins filled in
+        base_query = self._base_template(entity_type).format(
+            with_clause=with_clause,
+            event_where=' AND '.join(event_conditions),
+            address_where=' AND '.join(address_conditions),
+            flag_joins=flag_joins,
+        )
         
         # Build WHERE conditions
         where_conditions = []
-        query_params = []
+        
+        # Entities must still have a matching event / address when filtered
+        if category_count or has_date_from or has_date_to:
+            where_conditions.append("e.entity_id IS NOT NULL")
+        if has_country:
+            where_conditions.append("ad.entity_id IS NOT NULL")
         
         # Name search with proper escaping
-        if search_params.get('name'):
+        if has_name:
             where_conditions.append("LOWER(m.entity_name) LIKE LOWER(?)")
-            query_params.append(f"%{search_params['name']}%")
-        
-        # CORRECTED: PEP-only filter using proper PTY lookup
-        if search_params.get('pep_only'):
-            where_conditions.append("""
-                EXISTS (
-                    SELECT 1 FROM prd_bronze_catalog.grid.{}_attributes pep_attr
-                    WHERE pep_attr.entity_id = m.entity_id 
-                    AND pep_attr.alias_code_type = 'PTY'
-                )
-            """.format(entity_type))
         
-        # CORRECTED: PEP type filter
-        if search_params.get('pep_types'):
-            pep_types = search_params['pep_types']
-            if isinstance(pep_types, str):
-                pep_types = [pep_types]
-            
-            pep_conditions = []
-            for pep_type in pep_types:
-                pep_conditions.append("attr.alias_value LIKE ?")
-                query_params.append(f"%{pep_type}%")
-            
-            where_conditions.append(f"""
-                EXISTS (
-                    SELECT 1 FROM prd_bronze_catalog.grid.{entity_type}_attributes pep_attr
-                    WHERE pep_attr.entity_id = m.entity_id 
-                    AND pep_attr.alias_code_type = 'PTY'
-                    AND ({' OR '.join(pep_conditions)})
-                )
-            """)
-        
-        # Country filter
-        if search_params.get('country'):
-            where_conditions.append("LOWER(addr.address_country) = LOWER(?)")
-            query_params.append(search_params['country'])
-        
-        # Event category filter
-        if search_params.get('event_categories'):
-            categories = search_params['event_categories']
-            if isinstance(categories, str):
-                categories = [categories]
-            
-            placeholders = ','.join(['?' for _ in categories])
-            where_conditions.append(f"ev.event_category_code IN ({placeholders})")
-            query_params.extend(categories)
+        # CORRECTED: PEP type filter, one RLIKE over all requested types; it
+        # implies the PEP-only filter (entity_flags holds PTY rows only)
+        if has_pep_types:
+            where_conditions.append("EXISTS(ef.pep_values, v -> v RLIKE ?)")
+        elif pep_only:
+            where_conditions.append("ef.entity_id IS NOT NULL")
         
         # Date range filter using individual_date_of_births
-        if entity_type == 'individual' and search_params.get('birth_year'):
-            birth_year = search_params['birth_year']
+        if has_birth_year:
             where_conditions.append("dob.date_of_birth_year = ?")
-            query_params.append(str(birth_year))
         
-        # Date range for events
-        if search_params.get('event_date_from'):
-            where_conditions.append("ev.event_date >= ?")
-            query_params.append(search_params['event_date_from'])
-            
-        if search_params.get('event_date_to'):
-            where_conditions.append("ev.event_date <= ?")
-            query_params.append(search_params['event_date_to'])
+        where_conditions.extend(extra_sql)
         
         # Combine query
         if where_conditions:
             base_query += " WHERE " + " AND ".join(where_conditions)
         
-        # Group by and order
+        # One row per entity by construction: no outer GROUP BY or DISTINCT
         base_query += f"""
-        GROUP BY m.entity_id, m.risk_id, m.entity_name, m.recordDefinitionType, 
-                 m.source_item_id, m.systemId, m.entityDate,
-                 dob.date_of_birth_year, dob.date_of_birth_month, 
-                 dob.date_of_birth_day, dob.date_of_birth_circa,
-                 bvd.bvdid, bvd.entitytype
         ORDER BY m.entity_name
-        LIMIT {search_params.get('limit', 100)}
+        LIMIT {limit}
         """
         
-        return base_query, query_params
+        return base_query
 
     def build_advanced_boolean_query(self, entity_type: str, boolean_expression: str, search_params: Dict) -> Tuple[str, List]:
         """
@@ -363,206 +777,434 @@ class DatabaseCorrections:
         
         Supports complex expressions like:
         - (PEP_TYPE:MUN OR PEP_TYPE:REG) AND COUNTRY:Brazil
-        - RISK_CATEGORY:BRB AND PEP_LEVEL:L3
-        - NAME:John AND (EVENT:CVT OR EVENT:SAN)
+        - RISK_CATEGORY:BRB AND NOT COUNTRY:Brazil
+        - NAME:John AND (RISK_CATEGORY:SAN OR RISK_CATEGORY:TER)
         """
         
         try:
-            # Parse boolean expression into conditions
-            conditions = self._parse_boolean_expression(boolean_expression)
-            
-            # Build base query
-            base_query, base_params = self.build_corrected_search_query(entity_type, search_params)
-            
-            # Add boolean conditions
-            boolean_conditions = []
-            boolean_params = []
+            # Parse boolean expression into an AST
+            tree = self._parse_boolean_expression(boolean_expression)
+            if tree is None:
+                conjuncts = []
+            elif tree.get('op') == 'AND':
+                conjuncts = tree['children']
+            else:
+                conjuncts = [tree]
             
-            for condition in conditions:
-                field = condition.get('field', '').upper()
-                operator = condition.get('operator', '=')
-                value = condition.get('value', '')
-                
-                if field == 'PEP_TYPE':
-                    boolean_conditions.append(f"""
-                        EXISTS (
-                            SELECT 1 FROM prd_bronze_catalog.grid.{entity_type}_attributes ba
-                            WHERE ba.entity_id = m.entity_id 
-                            AND ba.alias_code_type = 'PTY'
-                            AND ba.alias_value LIKE ?
-                        )
-                    """)
-                    boolean_params.append(f"%{value}%")
-                    
-                elif field == 'RISK_CATEGORY':
-                    boolean_conditions.append(f"""
-                        EXISTS (
-                            SELECT 1 FROM prd_bronze_catalog.grid.{entity_type}_events be
-                            WHERE be.entity_id = m.entity_id 
-                            AND be.event_category_code = ?
-                        )
-                    """)
-                    boolean_params.append(value)
-                    
-                elif field == 'COUNTRY':
-                    boolean_conditions.append(f"""
-                        EXISTS (
-                            SELECT 1 FROM prd_bronze_catalog.grid.{entity_type}_addresses bc
-                            WHERE bc.entity_id = m.entity_id 
-                            AND LOWER(bc.address_country) = LOWER(?)
-                        )
-                    """)
-                    boolean_params.append(value)
-                    
-                elif field == 'NAME':
-                    boolean_conditions.append("LOWER(m.entity_name) LIKE LOWER(?)")
-                    boolean_params.append(f"%{value}%")
-            
-            # Combine with existing WHERE clause
-            if boolean_conditions:
-                if 'WHERE' in base_query:
-                    base_query = base_query.replace('ORDER BY', f" AND ({' AND '.join(boolean_conditions)}) ORDER BY")
-                else:
-                    base_query = base_query.replace('GROUP BY', f" WHERE {' AND '.join(boolean_conditions)} GROUP BY")
-                
-                base_params.extend(boolean_params)
+            # Child-table leaves ANDed at the top share one matching_entities
+            # semi-join; everything else is rendered as WHERE predicates
+            semi_join_leaves = [
+                node for node in conjuncts
+                if 'field' in node and node['field'].upper() in self._SEMI_JOIN_LEAVES
+            ]
+            flags = set()
+            predicates = [
+                predicate for predicate in (
+                    self._emit_sql(node, flags) for node in conjuncts if node not in semi_join_leaves
+                )
+                if predicate
+            ]
+            semi_join = self._semi_join_sql(entity_type, semi_join_leaves) if semi_join_leaves else None
             
-            return base_query, base_params
+            return self.build_corrected_search_query(entity_type, search_params, flags, predicates, semi_join)
             
         except Exception as e:
             logger.error(f"Boolean query parsing error: {e}")
             # Fallback to basic query
             return self.build_corrected_search_query(entity_type, search_params)
 
-    def _parse_boolean_expression(self, expression: str) -> List[Dict]:
-        """Parse boolean expression into structured conditions"""
-        conditions = []
-        
-        # Simple parsing for key:value pairs
-        # This can be enhanced with more sophisticated parsing
-        parts = expression.replace('(', '').replace(')', '').split(' AND ')
-        
-        for part in parts:
-            part = part.strip()
-            if ':' in part:
-                field, value = part.split(':', 1)
-                conditions.append({
-                    'field': field.strip(),
-                    'operator': '=',
-                    'value': value.strip()
-                })
+    def _tokenize_boolean(self, expression: str) -> List[Tuple]:
+        """Split a boolean expression into paren, operator and leaf tokens"""
+        tokens = []
+        expression = expression.strip()
+        pos = 0
+        while pos < len(expression):
+            match = _BOOLEAN_TOKEN.match(expression, pos)
+            if not match:
+                raise ValueError(f"Unexpected input at {pos}: {expression[pos:pos + 20]!r}")
+            pos = match.end()
+            if match.group('paren'):
+                tokens.append((match.group('paren'),))
+            elif match.group('op'):
+                tokens.append(('OP', match.group('op')))
+            else:
+                value = match.group('value').strip()
+                if value.startswith('"'):
+                    value = value[1:-1]
+                tokens.append(('LEAF', match.group('field'), value))
+        return tokens
+
+    def _parse_boolean_expression(self, expression: str) -> Optional[Dict]:
+        """
+        Parse boolean expression into an AST
+        
+        Nodes are {'op': 'AND'|'OR'|'NOT', 'children': [...]} and leaves are
+        {'field', 'value'}; NOT binds tightest, then AND, then OR. One
+        shunting-yard pass over the tokens, so nesting depth is not bounded
+        by the recursion limit.
+        """
+        tokens = self._tokenize_boolean(expression)
+        if not tokens:
+            return None
+        
+        operands: List[Dict] = []
+        operators: List[str] = []
+        expect_operand = True
+        for token in tokens:
+            if expect_operand:
+                if token == ('OP', 'NOT') or token == ('(',):
+                    operators.append(token[-1])
+                elif token[0] == 'LEAF':
+                    operands.append({'field': token[1], 'value': token[2]})
+                    expect_operand = False
+                else:
+                    raise ValueError(f"Unexpected token {token!r}")
+            elif token == (')',):
+                self._reduce_boolean(operands, operators, 0)
+                if not operators:
+                    raise ValueError("Unbalanced parentheses")
+                operators.pop()
+            elif token[0] == 'OP' and token[1] != 'NOT':
+                self._reduce_boolean(operands, operators, _BOOLEAN_PRECEDENCE[token[1]])
+                operators.append(token[1])
+                expect_operand = True
+            else:
+                raise ValueError(f"Unexpected token {token!r}")
+        
+        if expect_operand:
+            raise ValueError("Unexpected end of expression")
+        self._reduce_boolean(operands, operators, 0)
+        if operators:
+            raise ValueError("Unbalanced parentheses")
+        return operands[0]
+
+    @staticmethod
+    def _reduce_boolean(operands: List[Dict], operators: List[str], min_precedence: int) -> None:
+        """Apply stacked operators down to the nearest '(' or a looser operator"""
+        while operators and operators[-1] != '(' and _BOOLEAN_PRECEDENCE[operators[-1]] >= min_precedence:
+            op = operators.pop()
+            if op == 'NOT':
+                operands.append({'op': 'NOT', 'children': [operands.pop()]})
+                continue
+            right = operands.pop()
+            left = operands.pop()
+            # Chains of one operator stay a single flat node
+            children = [
+                child for node in (left, right)
+                for child in (node['children'] if node.get('op') == op else [node])
+            ]
+            operands.append({'op': op, 'children': children})
+
+    def _emit_sql(self, node: Dict, flags: set) -> Optional[Tuple[str, List]]:
+        """Render an AST node as (sql, params), recording the flag CTEs it uses"""
+        if 'field' in node:
+            spec = self._BOOLEAN_FIELDS.get(node['field'].upper())
+            if spec is None:
+                logger.warning(f"Ignoring unsupported boolean field: {node['field']}")
+                return None
+            predicate, flag, param_format = spec
+            if flag:
+                flags.add(flag)
+            return predicate, [param_format.format(node['value'])]
+        
+        # Unsupported leaves drop out of their parent, as they always have
+        parts = [part for part in (self._emit_sql(child, flags) for child in node['children']) if part]
+        if not parts:
+            return None
+        if node['op'] == 'NOT':
+            sql, params = parts[0]
+            return f"NOT ({sql})", params
         
-        return conditions
+        sql = f" {node['op']} ".join(part_sql for part_sql, _ in parts)
+        return f"({sql})", [param for _, part_params in parts for param in part_params]
 
-    def process_corrected_results(self, raw_results: List[Dict]) -> List[Dict]:
+    def process_corrected_results(self, raw_results: Iterable[Dict]) -> Iterator[Dict]:
         """
         Process raw database results with CORRECTED PEP and risk analysis
         
-        Fixes all data processing issues found in main.py audit
+        Fixes all data processing issues found in main.py audit. Yields processed
+        rows lazily, so a fetchmany() stream is never held in memory at once.
+        Accepts an iterable of row dicts or a pyarrow Table/RecordBatch;
+        Arrow input with nested attributes/events columns is scored column-wise.
+        Dict rows carrying the warehouse-derived is_pep column skip PEP parsing
+        for non-PEPs; a warehouse risk_score is taken as the score, while
+        risk_details are still built client-side as on the Arrow path.
         """
-        processed_results = []
-        
-        for result in raw_results:
-            try:
-                # Extract and process attributes
-                attributes = result.get('attributes', [])
-                if isinstance(attributes, str):
-                    try:
-                        attributes = json.loads(attributes)
-                    except:
-                        attributes = []
-                
-                # CORRECTED: Use proper PEP extraction
-                pep_info = self.extract_correct_pep_info(attributes)
-                
-                # Extract and process events
-                events = result.get('events', [])
-                if isinstance(events, str):
-                    try:
-                        events = json.loads(events)
-                    except:
-                        events = []
-                
-                # CORRECTED: Use proper risk calculation
-                risk_info = self.calculate_correct_risk_score(events)
-                
-                # Process addresses
-                addresses = result.get('addresses', [])
-                if isinstance(addresses, str):
-                    try:
-                        addresses = json.loads(addresses)
-                    except:
-                        addresses = []
-                
-                # Build comprehensive result
-                processed_result = {
-                    'entity_id': result.get('entity_id'),
-                    'risk_id': result.get('risk_id'),
-                    'entity_name': result.get('entity_name'),
-                    'entity_type': result.get('recordDefinitionType', '').lower(),
-                    'source_item_id': result.get('source_item_id'),
-                    'system_id': result.get('systemId'),
-                    'entity_date': result.get('entityDate'),
-                    
-                    # CORRECTED: Proper PEP information
-                    'is_pep': pep_info['is_pep'],
-                    'pep_type': pep_info['pep_type'],
-                    'pep_level': pep_info['pep_level'],
-                    'pep_description': pep_info['pep_description'],
-                    'pep_associations': pep_info['pep_associations'],
-                    'pep_details': pep_info['pep_details'],
-                    
-                    # CORRECTED: Proper risk scoring
-                    'risk_score': risk_info['risk_score'],
-                    'risk_category': risk_info['risk_category'],
-                    'risk_details': risk_info['risk_details'],
-                    
-                    # Additional data
-                    'birth_year': result.get('date_of_birth_year'),
-                    'birth_month': result.get('date_of_birth_month'),
-                    'birth_day': result.get('date_of_birth_day'),
-                    'birth_circa': result.get('date_of_birth_circa'),
-                    
-                    'bvd_id': result.get('bvdid'),
-                    'bvd_entity_type': result.get('bvd_entity_type'),
-                    
-                    'addresses': addresses,
-                    'events': events,
-                    'attributes': attributes,
-                    
-                    # Export-ready summary
-                    'export_summary': self._create_export_summary(result, pep_info, risk_info)
-                }
-                
-                processed_results.append(processed_result)
-                
-            except Exception as e:
-                logger.error(f"Error processing result for entity {result.get('entity_id', 'unknown')}: {e}")
-                continue
+        if PYARROW_AVAILABLE and isinstance(raw_results, (pa.Table, pa.RecordBatch)):
+            if self._has_nested_columns(raw_results.schema):
+                yield from self._process_arrow_results(raw_results)
+                return
+            raw_results = raw_results.to_pylist()
+        
+        if self.max_workers <= 1:
+            for result in raw_results:
+                processed_result = self._process_one(result)
+                if processed_result is not None:
+                    yield processed_result
+            return
         
-        return processed_results
+        # Bounded batches keep the stream lazy; map() preserves row order
+        rows = iter(raw_results)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                batch = list(itertools.islice(rows, self.PARALLEL_BATCH_SIZE))
+                if not batch:
+                    break
+                for processed_result in executor.map(self._process_one, batch):
+                    if processed_result is not None:
+                        yield processed_result
 
-    def _create_export_summary(self, result: Dict, pep_info: Dict, risk_info: Dict) -> Dict:
-        """Create export-ready summary with all corrected data"""
+    def stream_corrected_results(self, cursor, batch_size: int = ARROW_FETCH_SIZE) -> Iterator[Dict]:
+        """
+        Fetch an executed cursor in batches and yield processed rows
+        
+        Uses Arrow batches (nested attributes/events columns, no JSON text or
+        per-row Python objects on the wire) when the driver supports them,
+        plain fetchmany() rows otherwise.
+        """
+        cursor.arraysize = batch_size
+        if PYARROW_AVAILABLE and hasattr(cursor, 'fetchmany_arrow'):
+            while True:
+                batch = cursor.fetchmany_arrow(batch_size)
+                if batch.num_rows == 0:
+                    break
+                yield from self.process_corrected_results(batch)
+            return
+        
+        columns = [desc[0] for desc in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from self.process_corrected_results(dict(zip(columns, row)) for row in rows)
+
+    def _process_one(self, result: Dict) -> Optional[Dict]:
+        """Process a single raw row; None (logged) when it cannot be processed"""
+        try:
+            # Extract and process attributes
+            attributes = _decode_json_list(result.get('attributes', []))
+            
+            # CORRECTED: Use proper PEP extraction (nothing to parse for non-PEPs)
+            pep_info = self.extract_correct_pep_info(attributes if result.get('is_pep', 1) else [])
+            
+            # Extract and process events
+            events = _decode_json_list(result.get('events', []))
+            
+            # CORRECTED: Use proper risk calculation; a score already computed
+            # in SQL stands, but the per-event details are always built here
+            risk_info = self.calculate_correct_risk_score(events)
+            if result.get('risk_score') is not None:
+                risk_info['risk_score'] = result['risk_score']
+                risk_info['risk_category'] = self._risk_category(result['risk_score'])
+            
+            # Process addresses
+            addresses = _decode_json_list(result.get('addresses', []))
+            
+            return self._build_processed_result(result, attributes, events, addresses, pep_info, risk_info)
+            
+        except Exception as e:
+            logger.error(f"Error processing result for entity {result.get('entity_id', 'unknown')}: {e}")
+            return None
+
+    def _build_processed_result(self, result: Dict, attributes: List, events: List, addresses: List,
+                                pep_info: Dict, risk_info: Dict) -> Dict:
+        """Assemble one processed row from the raw row and its PEP/risk analysis"""
         return {
-            'Entity_ID': result.get('entity_id', ''),
-            'Risk_ID': result.get('risk_id', ''),
-            'Entity_Name': result.get('entity_name', ''),
-            'Entity_Type': result.get('recordDefinitionType', ''),
-            'Is_PEP': 'Yes' if pep_info['is_pep'] else 'No',
-            'PEP_Type': pep_info.get('pep_type', ''),
-            'PEP_Level': pep_info.get('pep_level', ''),
-            'PEP_Description': pep_info.get('pep_description', ''),
-            'PEP_Associations': '; '.join(pep_info.get('pep_associations', [])),
-            'Risk_Score': risk_info.get('risk_score', 0),
-            'Risk_Category': risk_info.get('risk_category', ''),
-            'Birth_Year': result.get('date_of_birth_year', ''),
-            'BVD_ID': result.get('bvdid', ''),
-            'Source_ID': result.get('source_item_id', ''),
-            'System_ID': result.get('systemId', ''),
-            'Entity_Date': result.get('entityDate', ''),
+            'entity_id': result.get('entity_id'),
+            'risk_id': result.get('risk_id'),
+            'entity_name': result.get('entity_name'),
+            'entity_type': result.get('recordDefinitionType', '').lower(),
+            'source_item_id': result.get('source_item_id'),
+            'system_id': result.get('systemId'),
+            'entity_date': result.get('entityDate'),
+            
+            # CORRECTED: Proper PEP information
+            'is_pep': pep_info['is_pep'],
+            'pep_type': pep_info['pep_type'],
+            'pep_level': pep_info['pep_level'],
+            'pep_description': pep_info['pep_description'],
+            'pep_associations': pep_info['pep_associations'],
+            'pep_details': pep_info['pep_details'],
+            
+            # CORRECTED: Proper risk scoring
+            'risk_score': risk_info['risk_score'],
+            'risk_category': risk_info['risk_category'],
+            'risk_details': risk_info['risk_details'],
+            
+            # Additional data
+            'birth_year': result.get('date_of_birth_year'),
+            'birth_month': result.get('date_of_birth_month'),
+            'birth_day': result.get('date_of_birth_day'),
+            'birth_circa': result.get('date_of_birth_circa'),
+            
+            'bvd_id': result.get('bvdid'),
+            'bvd_entity_type': result.get('bvd_entity_type'),
+            
+            'addresses': addresses,
+            'events': events,
+            'attributes': attributes,
+            
+            # Export-ready summary
+            'export_summary': self._create_export_summary(result, pep_info, risk_info)
         }
 
+    @staticmethod
+    def _has_nested_columns(schema) -> bool:
+        """True when attributes/events arrive as list<struct> rather than JSON text"""
+        names = set(schema.names)
+        return all(
+            name in names and pa.types.is_list(schema.field(name).type)
+            for name in ('attributes', 'events')
+        )
+
+    @staticmethod
+    def _list_offsets(parents, num_rows: int):
+        """Offsets grouping an ordered parent-index array into one list per row"""
+        return pa.array(np.searchsorted(parents, np.arange(num_rows + 1)), type=pa.int32())
+
+    @staticmethod
+    def _last_index(parents, mask, num_rows: int):
+        """Position of the last flat element per row where mask holds, -1 if none"""
+        last = np.full(num_rows, -1, dtype=np.int64)
+        positions = np.flatnonzero(mask)
+        np.maximum.at(last, parents[positions], positions)
+        return last
+
+    def _arrow_pep_columns(self, attributes, num_rows: int) -> Dict[str, list]:
+        """Column-wise equivalent of extract_correct_pep_info over list<struct> attributes"""
+        flat = pc.list_flatten(attributes)
+        parents = pc.list_parent_indices(attributes)
+        values = flat.field('alias_value')
+        keep = pc.fill_null(
+            pc.and_(pc.equal(flat.field('alias_code_type'), 'PTY'), pc.greater(pc.utf8_length(values), 0)),
+            False
+        )
+        values = pc.filter(values, keep)
+        parents = pc.filter(parents, keep).to_numpy()
+        
+        known = pa.array(list(self.pep_types))
+        descriptions = np.array(list(self.pep_types.values()) + [None], dtype=object)
+        
+        # 'MUN:L3' style values; the code only counts when it is a known PEP type
+        parsed = pc.extract_regex(values, r'(?s)^(?P<code>[^:]*):(?P<level>.*)$')
+        colon = parsed.is_valid().to_numpy(zero_copy_only=False)
+        codes = pc.utf8_trim_whitespace(parsed.field('code'))
+        levels = pc.utf8_trim_whitespace(parsed.field('level')).to_numpy(zero_copy_only=False)
+        code_idx = pc.index_in(codes, value_set=known).fill_null(-1).to_numpy()
+        direct_idx = pc.index_in(values, value_set=known).fill_null(-1).to_numpy()
+        
+        coded = colon & (code_idx >= 0)
+        direct = ~colon & (direct_idx >= 0)
+        related = ~colon & ~direct & (
+            pc.match_substring(values, 'Family Member of').to_numpy(zero_copy_only=False)
+            | pc.match_substring(values, 'Associate of').to_numpy(zero_copy_only=False)
+        )
+        family = related & pc.match_substring(values, 'Family').to_numpy(zero_copy_only=False)
+        associate = related & ~family
+        associations = ~colon & ~direct
+        
+        value_array = values.to_numpy(zero_copy_only=False)
+        pep_type = np.full(len(values) + 1, None, dtype=object)
+        pep_description = np.full(len(values) + 1, None, dtype=object)
+        pep_level = np.append(levels, None)
+        pep_type[:-1][coded] = codes.to_numpy(zero_copy_only=False)[coded]
+        pep_type[:-1][direct] = value_array[direct]
+        pep_type[:-1][family] = 'FAM'
+        pep_type[:-1][associate] = 'ASC'
+        pep_description[:-1][coded] = descriptions[code_idx[coded]]
+        pep_description[:-1][direct] = descriptions[direct_idx[direct]]
+        pep_description[:-1][family] = 'Family Member'
+        pep_description[:-1][associate] = 'Close Associate'
+        
+        # Later attributes overwrite earlier ones, as in the row-wise loop;
+        # index -1 selects the trailing None
+        last_type = self._last_index(parents, coded | direct | related, num_rows)
+        last_level = self._last_index(parents, coded, num_rows)
+        
+        return {
+            'is_pep': (np.bincount(parents, minlength=num_rows) > 0).tolist(),
+            'pep_type': pep_type[last_type].tolist(),
+            'pep_level': pep_level[last_level].tolist(),
+            'pep_description': pep_description[last_type].tolist(),
+            'pep_associations': pa.ListArray.from_arrays(
+                self._list_offsets(parents[associations], num_rows),
+                pc.filter(values, pa.array(associations))
+            ).to_pylist(),
+            'pep_details': pa.ListArray.from_arrays(self._list_offsets(parents, num_rows), values).to_pylist(),
+        }
+
+    def _arrow_risk_columns(self, events, num_rows: int) -> Dict[str, list]:
+        """Column-wise equivalent of calculate_correct_risk_score over list<struct> events"""
+        flat = pc.list_flatten(events)
+        parents = pc.list_parent_indices(events).to_numpy()
+        categories = flat.field('event_category_code')
+        sub_categories = flat.field('event_sub_category_code')
+        
+        # Lookup tables with the default appended, so a miss (-1) takes it;
+        # nulls are filled only for the lookup, details keep them as None
+        base_table = np.array(list(self.event_risk_scores.values()) + [10], dtype=np.int64)
+        modifier_table = np.array(list(self.sub_category_modifiers.values()) + [1.0], dtype=np.float64)
+        base = base_table[
+            pc.index_in(pc.fill_null(categories, ''), value_set=pa.array(list(self.event_risk_scores))).fill_null(-1).to_numpy()
+        ]
+        modifier = modifier_table[
+            pc.index_in(pc.fill_null(sub_categories, ''), value_set=pa.array(list(self.sub_category_modifiers))).fill_null(-1).to_numpy()
+        ]
+        final = np.minimum((base * modifier).astype(np.int64), 100)
+        
+        risk_score = np.zeros(num_rows, dtype=np.int64)
+        np.maximum.at(risk_score, parents, final)
+        has_events = np.bincount(parents, minlength=num_rows) > 0
+        risk_category = np.select(
+            [~has_events, risk_score >= 80, risk_score >= 60, risk_score >= 40],
+            ['Unknown', 'Critical', 'Valuable', 'Investigative'],
+            'Probative'
+        )
+        
+        details = pa.StructArray.from_arrays(
+            [categories, sub_categories, pa.array(base), pa.array(modifier), pa.array(final)],
+            names=['event_category', 'event_sub_category', 'base_score', 'modifier', 'final_score']
+        )
+        return {
+            'risk_score': risk_score.tolist(),
+            'risk_category': risk_category.tolist(),
+            'risk_details': pa.ListArray.from_arrays(self._list_offsets(parents, num_rows), details).to_pylist(),
+        }
+
+    def _process_arrow_results(self, table) -> Iterator[Dict]:
+        """Score a whole Arrow result at once, then emit rows in the usual shape"""
+        if isinstance(table, pa.RecordBatch):
+            table = pa.Table.from_batches([table])
+        num_rows = table.num_rows
+        pep = self._arrow_pep_columns(table.column('attributes').combine_chunks(), num_rows)
+        risk = self._arrow_risk_columns(table.column('events').combine_chunks(), num_rows)
+        
+        for i, result in enumerate(table.to_pylist()):
+            pep_info = {key: column[i] for key, column in pep.items()}
+            risk_info = {key: column[i] for key, column in risk.items()}
+            yield self._build_processed_result(
+                result, result.get('attributes') or [], result.get('events') or [],
+                result.get('addresses') or [], pep_info, risk_info
+            )
+
+    def _create_export_summary(self, result: Dict, pep_info: Dict, risk_info: Dict) -> Dict:
+        """Create export-ready summary with all corrected data"""
+        try:
+            (entity_id, risk_id, entity_name, record_type, birth_year,
+             bvd_id, source_id, system_id, entity_date) = _RESULT_EXPORT_GETTER(result)
+        except KeyError:
+            # Rows not produced by build_corrected_search_query may lack columns
+            (entity_id, risk_id, entity_name, record_type, birth_year,
+             bvd_id, source_id, system_id, entity_date) = (result.get(key, '') for key in _RESULT_EXPORT_KEYS)
+        is_pep, pep_type, pep_level, pep_description, pep_associations = _PEP_EXPORT_GETTER(pep_info)
+        score, category = _RISK_EXPORT_GETTER(risk_info)
+        
+        return dict(zip(EXPORT_COLUMNS, (
+            entity_id, risk_id, entity_name, record_type,
+            'Yes' if is_pep else 'No', pep_type, pep_level, pep_description, '; '.join(pep_associations),
+            score, category, birth_year, bvd_id, source_id, system_id, entity_date,
+        )))
+
 # Usage example for integration with main.py:
 """
 # In main.py, replace existing methods with:
@@ -580,12 +1222,17 @@ class EntitySearchApp:
             entity_type, search_params
         )
         
-        # Execute query and process results
+        # Execute query and stream results in bounded batches; open the
+        # connection with sql.connect(..., use_cloud_fetch=True) so large
+        # Arrow results download in parallel
         cursor = self.connection.cursor()
         cursor.execute(query, params)
-        raw_results = [dict(zip([col[0] for col in cursor.description], row)) 
-                      for row in cursor.fetchall()]
         
-        # Process with corrected logic
-        return self.db_corrections.process_corrected_results(raw_results)
+        # Optionally, once per session and before building queries, move the
+        # scoring maps into broadcastable temp views:
+        # self.db_corrections.register_lookup_views(cursor)
+        
+        # Arrow keeps attributes/events as nested columns, scored column-wise;
+        # only one batch is live at a time
+        yield from self.db_corrections.stream_corrected_results(cursor)
 """
\ No newline at end of file
@@ -5,113 +5,405 @@ No hardcoding - everything comes from live data
 """
 
 import logging
-from typing import Dict, Any, List, Tuple, Optional
+import re
+import sys
+import functools
+import queue
+import threading
+import concurrent.futures
+from contextlib import contextmanager
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, List, Tuple, Optional, Iterator
 from datetime import datetime
 import json
 from databricks import sql
 import os
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 # Load environment variables
 load_dotenv(override=True)
 
+# Warehouse connections kept open for concurrent queries
+DB_POOL_SIZE = max(1, int(os.getenv("DB_POOL_SIZE", "4")))
+
 logger = logging.getLogger(__name__)
 
+# High-risk keywords from actual database descriptions, by severity
+CRITICAL_KEYWORDS = (
+    'terror', 'trafficking', 'murder', 'watch list', 'denied', 'sanction',
+    'laundering', 'human rights', 'kidnap', 'espionage', 'organized crime'
+)
+VALUABLE_KEYWORDS = (
+    'fraud', 'bribery', 'corruption', 'conspiracy', 'tax', 'securities',
+    'regulatory', 'embezzle', 'extortion', 'insider'
+)
+INVESTIGATIVE_KEYWORDS = (
+    'assault', 'battery', 'theft', 'burglary', 'forgery', 'cyber',
+    'identity', 'counterfeit', 'smuggling', 'fugitive'
+)
+
+# Severity buckets in precedence order: (severity, keywords, score floor, boost)
+SEVERITY_BUCKETS = (
+    ('critical', CRITICAL_KEYWORDS, 85, 25),
+    ('valuable', VALUABLE_KEYWORDS, 65, 15),
+    ('investigative', INVESTIGATIVE_KEYWORDS, 45, 10),
+)
+
+# One compiled alternation per bucket, searched in precedence order (a single
+# combined pattern would return the leftmost keyword, not the most severe)
+SEVERITY_PATTERNS = tuple(
+    (severity, re.compile('|'.join(map(re.escape, keywords))))
+    for severity, keywords, _, _ in SEVERITY_BUCKETS
+)
+
+# Severity -> (score floor, boost over the usage-based base score)
+SEVERITY_SCORING = MappingProxyType({severity: (floor, boost) for severity, _, floor, boost in SEVERITY_BUCKETS})
+
+# The same keyword bucketing evaluated in the warehouse (keywords are plain
+# lowercase words, so they need no regex escaping)
+SEVERITY_HINT_SQL = "CASE " + " ".join(
+    f"WHEN LOWER(code_description) RLIKE '{'|'.join(keywords)}' THEN '{severity}'"
+    for severity, keywords, _, _ in SEVERITY_BUCKETS
+) + " END"
+
+# User customization file; USER_EVENT_CONFIG overrides the default location
+DEFAULT_USER_EVENT_CONFIG = "/Users/sujanmukhiya/Desktop/NiceGUI_GRID/advanced_entity_search/user_event_config.json"
+
+# Per-code fields persisted in the user customization file
+CUSTOMIZED_FIELDS = ('risk_score', 'severity', 'name', 'description', 'user_customized')
+
+# Definitions for every code type, with the warehouse-side severity bucket;
+# unsorted, since nothing depends on load order (summaries sort in Python)
+CODE_DICTIONARY_QUERY = f"""
+        SELECT 
+            code,
+            code_description,
+            code_type,
+            {SEVERITY_HINT_SQL} AS severity_hint
+        FROM prd_bronze_catalog.grid.code_dictionary
+        WHERE code_type IN ('event_category', 'event_sub_category', 'entity_attribute')
+        """
+
+# Minimal codes used when the database is unavailable: (code, name, risk score, severity)
+FALLBACK_CODES = (
+    ('TER', 'Terrorism', 100, 'critical'),
+    ('DTF', 'Drug Trafficking', 90, 'critical'),
+    ('MLA', 'Money Laundering', 85, 'critical'),
+    ('FRD', 'Fraud', 70, 'valuable'),
+    ('BRB', 'Bribery', 75, 'valuable'),
+)
+
+# Rows per fetchmany() call when streaming query results
+FETCH_BATCH_SIZE = 1000
+
+# Per-code usage statistics columns, as returned by the usage query
+USAGE_COLUMNS = (
+    'total_usage', 'unique_entities', 'recent_usage', 'avg_days_old',
+    'first_seen', 'last_seen', 'frequency_rank',
+)
+
+# Event tables aggregated into the usage statistics
+USAGE_EVENT_TABLES = ('individual_events', 'organization_events')
+
+# Integer count columns, held as int64 arrays when NumPy is available
+USAGE_COUNT_COLUMNS = ('total_usage', 'unique_entities', 'recent_usage', 'frequency_rank')
+
+def _base_score(frequency_rank: int, total_usage: int, recent_usage: int) -> float:
+    """Usage-based base risk score for one code"""
+    # High frequency = lower base score (common events are often less critical individually)
+    base_score = max(15, 90 - (frequency_rank * 1.5))
+    
+    # Adjust for recent activity (recent = more relevant)
+    if recent_usage > 0:
+        base_score += min(20, recent_usage / max(1, total_usage) * 100)
+    return base_score
+
+# Base score for codes with no recorded usage
+UNUSED_BASE_SCORE = _base_score(999, 0, 0)
+
 class DatabaseDrivenCodes:
     """Event codes system that extracts everything from live database"""
     
     def __init__(self):
         """Initialize database-driven codes system"""
-        self.connection = None
+        # Connection pool: opened on demand up to DB_POOL_SIZE, then reused
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._pool_opened = 0
         self.event_codes = {}
         self.sub_category_codes = {}
         self.entity_attribute_codes = {}
         self.relationship_codes = {}
-        self.usage_statistics = {}
+        # Usage statistics as parallel columns: code -> row, column -> values
+        self._usage_index = {}
+        self._usage_columns = {}
+        self._usage_watermark = None
+        self.severity_hints = {}
         self.user_customizations = {}
         
+        # Customization file, re-parsed only when its mtime changes
+        self._config_path = Path(os.getenv("USER_EVENT_CONFIG", DEFAULT_USER_EVENT_CONFIG))
+        self._config_mtime = None
+        
+        # get_code_info results for every known code, with usage statistics
+        # merged in; rebuilt whenever the codes change
+        self._code_view = {}
+        self._names = {}
+        
+        # get_event_description results by (event_code, sub_code), filled on
+        # demand and cleared whenever names can change
+        self._description_lut = {}
+        
         # Initialize connection and load data
         self._init_database_connection()
         self._load_all_codes_from_database()
         self._load_user_customizations()
     
     def _init_database_connection(self):
-        """Initialize database connection"""
+        """Initialize the connection pool with one verified connection"""
         try:
-            self.connection = sql.connect(
-                server_hostname=os.getenv("DB_HOST"),
-                http_path=os.getenv("DB_HTTP_PATH"),
-                access_token=os.getenv("DB_ACCESS_TOKEN"),
-                catalog="prd_bronze_catalog",
-                schema="grid"
-            )
+            entry = self._open_pooled()
+            self._pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+            self._pool_opened = 1
+            self._pool.put(entry)
             logger.info("✅ Connected to database for live code extraction")
         except Exception as e:
             logger.error(f"❌ Database connection failed: {e}")
-            self.connection = None
+            self._pool = None
+    
+    @staticmethod
+    def _open_pooled() -> Tuple[Any, Any]:
+        """Open a new warehouse connection and the cursor reused for all its queries"""
+        connection = sql.connect(
+            server_hostname=os.getenv("DB_HOST"),
+            http_path=os.getenv("DB_HTTP_PATH"),
+            access_token=os.getenv("DB_ACCESS_TOKEN"),
+            catalog="prd_bronze_catalog",
+            schema="grid"
+        )
+        return connection, connection.cursor()
+    
+    @staticmethod
+    def _close_pair(entry: Tuple[Any, Any]):
+        """Close a pooled connection and its cursor"""
+        connection, cursor = entry
+        for resource in (cursor, connection):
+            try:
+                resource.close()
+            except Exception as e:
+                logger.debug(f"Ignoring error while closing {resource!r}: {e}")
+    
+    def _close_pooled(self, entry: Optional[Tuple[Any, Any]]):
+        """Close a pooled pair (None for an empty slot), freeing its pool slot"""
+        if entry is not None:
+            self._close_pair(entry)
+        with self._pool_lock:
+            self._pool_opened -= 1
     
-    def _execute_query(self, query: str) -> List[Dict[str, Any]]:
+    @contextmanager
+    def _pooled_cursor(self):
+        """Borrow a pooled connection's cursor, opening another while below DB_POOL_SIZE"""
+        try:
+            entry = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                open_new = self._pool_opened < DB_POOL_SIZE
+                if open_new:
+                    self._pool_opened += 1
+            entry = None if open_new else self._pool.get()
+        
+        # None is an empty slot, either new or left by a failed pair: fill it
+        if entry is None:
+            try:
+                entry = self._open_pooled()
+            except Exception:
+                # Hand the slot back so a waiting thread retries the connect
+                self._pool.put(None)
+                raise
+        
+        try:
+            yield entry[1]
+        except Exception:
+            # A failed query can leave the cursor unusable: close the pair and
+            # return its slot empty, so a blocked borrower wakes and reopens it
+            self._close_pair(entry)
+            entry = None
+            raise
+        finally:
+            self._pool.put(entry)
+    
+    def close(self):
+        """Close every idle pooled connection and cursor"""
+        if self._pool is None:
+            return
+        while True:
+            try:
+                entry = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            self._close_pooled(entry)
+    
+    def _execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Execute query and return results"""
-        if not self.connection:
+        return list(self._execute_query_stream(query, params))
+    
+    def _execute_query_stream(self, query: str, params: Optional[Dict[str, Any]] = None,
+                              batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """Execute query and yield result rows as dicts, one fetchmany() batch at a time"""
+        if self._pool is None:
             logger.error("No database connection available")
-            return []
+            return
         
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(query)
+            with self._pooled_cursor() as cursor:
+                cursor.execute(query, params)
                 columns = [desc[0] for desc in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(zip(columns, row))
         except Exception as e:
             logger.error(f"Query execution failed: {e}")
-            return []
+    
+    def _execute_query_arrow(self, query: str) -> Optional['pa.Table']:
+        """Execute query and return results as a pyarrow Table (None on failure)"""
+        if self._pool is None:
+            logger.error("No database connection available")
+            return None
+        
+        try:
+            with self._pooled_cursor() as cursor:
+                cursor.execute(query)
+                return cursor.fetchall_arrow()
+        except Exception as e:
+            logger.error(f"Query execution failed: {e}")
+            return None
     
     def _load_all_codes_from_database(self):
         """Load all codes and definitions from database"""
         try:
-            # 1. Load event category codes with definitions
-            event_query = """
-            SELECT 
-                code,
-                code_description,
-                code_type
-            FROM prd_bronze_catalog.grid.code_dictionary
-            WHERE code_type = 'event_category'
-            ORDER BY code
-            """
+            # 1. Load event category, sub-category and entity attribute codes
+            # (PEP types, etc.) with definitions in one round-trip, while
+            # 2. usage statistics load on a second pooled connection
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                loads = [
+                    executor.submit(self._load_code_dictionary),
+                    executor.submit(self._load_usage_statistics),
+                ]
+            for load in loads:
+                load.result()
             
-            event_results = self._execute_query(event_query)
-            logger.info(f"📋 Loaded {len(event_results)} event category codes from database")
+            # 3. Assign intelligent risk scores
+            self._assign_intelligent_risk_scores()
             
-            for row in event_results:
-                self.event_codes[row['code']] = {
-                    'name': row['code_description'],
-                    'description': row['code_description'],
-                    'code_type': row['code_type'],
-                    'source': 'database_dictionary'
-                }
+            logger.info("✅ Successfully loaded all codes from database")
             
-            # 2. Load usage statistics
-            usage_query = """
-            WITH event_stats AS (
-                SELECT 
-                    event_category_code as code,
-                    COUNT(*) as total_usage,
-                    COUNT(DISTINCT entity_id) as unique_entities,
-                    MIN(event_date) as first_seen,
-                    MAX(event_date) as last_seen,
-                    COUNT(CASE WHEN event_date >= DATE_SUB(CURRENT_DATE(), 365) THEN 1 END) as recent_usage,
-                    AVG(DATEDIFF(CURRENT_DATE(), event_date)) as avg_days_old
-                FROM (
-                    SELECT event_category_code, entity_id, event_date FROM prd_bronze_catalog.grid.individual_events
-                    UNION ALL
-                    SELECT event_category_code, entity_id, event_date FROM prd_bronze_catalog.grid.organization_events
-                ) all_events
-                WHERE event_category_code IS NOT NULL
-                GROUP BY event_category_code
+        except Exception as e:
+            logger.error(f"❌ Error loading codes from database: {e}")
+            self._load_fallback_codes()
+        
+        self._rebuild_code_view()
+    
+    def _load_code_dictionary(self):
+        """Load code definitions for every code type from code_dictionary"""
+        buckets = {
+            'event_category': self.event_codes,
+            'event_sub_category': self.sub_category_codes,
+            'entity_attribute': self.entity_attribute_codes,
+        }
+        loaded = dict.fromkeys(buckets, 0)
+        for row in self._execute_query_stream(CODE_DICTIONARY_QUERY):
+            # Interned, so reloads and repeated descriptions share one string
+            description = row['code_description']
+            if isinstance(description, str):
+                description = sys.intern(description)
+            buckets[row['code_type']][sys.intern(row['code'])] = {
+                'name': description,
+                'description': description,
+                'code_type': sys.intern(row['code_type']),
+                'source': 'database_dictionary'
+            }
+            loaded[row['code_type']] += 1
+            if row['code_type'] == 'event_category':
+                self.severity_hints[row['code']] = row['severity_hint']
+        
+        logger.info(f"📋 Loaded {loaded['event_category']} event category codes from database")
+        logger.info(f"📋 Loaded {loaded['event_sub_category']} event sub-category codes")
+        logger.info(f"📋 Loaded {loaded['entity_attribute']} entity attribute codes")
+    
+    @staticmethod
+    def _usage_query(incremental: bool = False) -> str:
+        """
+        Per-code usage aggregate over individual and organization events
+        
+        Ranked by total usage for a full load. With incremental, only codes
+        with events dated on or after the bound %(since)s parameter are
+        aggregated, over their full history, and left unranked.
+        """
+        code_filter = ""
+        if incremental:
+            # Inclusive, so rows ingested late for the watermark day are seen
+            touched = "\n                        UNION ".join(
+                f"SELECT event_category_code FROM prd_bronze_catalog.grid.{table} WHERE event_date >= %(since)s"
+                for table in USAGE_EVENT_TABLES
             )
+            code_filter = f"""
+                    AND event_category_code IN (
+                        {touched})"""
+        
+        # Each table is aggregated on its own, so only per-code partials are
+        # combined; entity ids are per table, so distinct counts add up
+        per_table = "\n                    UNION ALL".join(f"""
+                    SELECT 
+                        event_category_code as code,
+                        COUNT(*) as total_usage,
+                        COUNT(DISTINCT entity_id) as unique_entities,
+                        MIN(event_date) as first_seen,
+                        MAX(event_date) as last_seen,
+                        COUNT(CASE WHEN event_date >= DATE_SUB(CURRENT_DATE(), 365) THEN 1 END) as recent_usage,
+                        SUM(DATEDIFF(CURRENT_DATE(), event_date)) as days_old_sum,
+                        COUNT(event_date) as dated_events
+                    FROM prd_bronze_catalog.grid.{table}
+                    WHERE event_category_code IS NOT NULL{code_filter}
+                    GROUP BY event_category_code""" for table in USAGE_EVENT_TABLES)
+        event_stats = f"""
+                SELECT 
+                    code,
+                    SUM(total_usage) as total_usage,
+                    SUM(unique_entities) as unique_entities,
+                    MIN(first_seen) as first_seen,
+                    MAX(last_seen) as last_seen,
+                    SUM(recent_usage) as recent_usage,
+                    SUM(days_old_sum) / NULLIF(SUM(dated_events), 0) as avg_days_old
+                FROM ({per_table}
+                ) per_table
+                GROUP BY code
+            """
+        if incremental:
+            return event_stats
+        return f"""
+            WITH event_stats AS ({event_stats})
             SELECT 
                 code,
                 total_usage,
@@ -122,154 +414,163 @@ class DatabaseDrivenCodes:
                 last_seen,
                 ROW_NUMBER() OVER (ORDER BY total_usage DESC) as frequency_rank
             FROM event_stats
-            ORDER BY frequency_rank
-            """
-            
-            usage_results = self._execute_query(usage_query)
-            logger.info(f"📊 Loaded usage statistics for {len(usage_results)} codes")
-            
-            for row in usage_results:
-                code = row['code']
-                self.usage_statistics[code] = {
-                    'total_usage': row['total_usage'],
-                    'unique_entities': row['unique_entities'],
-                    'recent_usage': row['recent_usage'],
-                    'avg_days_old': row['avg_days_old'],
-                    'first_seen': row['first_seen'],
-                    'last_seen': row['last_seen'],
-                    'frequency_rank': row['frequency_rank']
-                }
-            
-            # 3. Load sub-category codes
-            sub_query = """
-            SELECT 
-                code,
-                code_description,
-                code_type
-            FROM prd_bronze_catalog.grid.code_dictionary
-            WHERE code_type = 'event_sub_category'
-            ORDER BY code
             """
-            
-            sub_results = self._execute_query(sub_query)
-            logger.info(f"📋 Loaded {len(sub_results)} event sub-category codes")
-            
-            for row in sub_results:
-                self.sub_category_codes[row['code']] = {
-                    'name': row['code_description'],
-                    'description': row['code_description'],
-                    'code_type': row['code_type'],
-                    'source': 'database_dictionary'
-                }
-            
-            # 4. Load entity attribute codes (PEP types, etc.)
-            attr_query = """
-            SELECT 
-                code,
-                code_description,
-                code_type
-            FROM prd_bronze_catalog.grid.code_dictionary
-            WHERE code_type = 'entity_attribute'
-            ORDER BY code
-            """
-            
-            attr_results = self._execute_query(attr_query)
-            logger.info(f"📋 Loaded {len(attr_results)} entity attribute codes")
-            
-            for row in attr_results:
-                self.entity_attribute_codes[row['code']] = {
-                    'name': row['code_description'],
-                    'description': row['code_description'],
-                    'code_type': row['code_type'],
-                    'source': 'database_dictionary'
-                }
-            
-            # 5. Assign intelligent risk scores
-            self._assign_intelligent_risk_scores()
-            
-            logger.info("✅ Successfully loaded all codes from database")
-            
-        except Exception as e:
-            logger.error(f"❌ Error loading codes from database: {e}")
-            self._load_fallback_codes()
     
-    def _assign_intelligent_risk_scores(self):
-        """Assign intelligent risk scores based on database content and usage"""
+    def _load_usage_statistics(self):
+        """Load ranked usage statistics for every event code"""
+        usage_query = self._usage_query()
         
-        # High-risk keywords from actual database descriptions
-        critical_keywords = [
-            'terror', 'trafficking', 'murder', 'watch list', 'denied', 'sanction',
-            'laundering', 'human rights', 'kidnap', 'espionage', 'organized crime'
-        ]
+        if PYARROW_AVAILABLE:
+            # Columnar fetch: rows are never boxed into per-row dicts
+            usage_table = self._execute_query_arrow(usage_query)
+            usage_count = usage_table.num_rows if usage_table is not None else 0
+            if usage_count:
+                self._store_usage(usage_table.column('code').to_pylist(), {
+                    name: (usage_table.column(name).to_numpy() if name in USAGE_COUNT_COLUMNS
+                           else usage_table.column(name).to_pylist())
+                    for name in USAGE_COLUMNS
+                })
+        else:
+            codes = []
+            columns = {name: [] for name in USAGE_COLUMNS}
+            for row in self._execute_query_stream(usage_query):
+                codes.append(row['code'])
+                for name, column in columns.items():
+                    column.append(row[name])
+            usage_count = len(codes)
+            if usage_count:
+                self._store_usage(codes, columns)
+        logger.info(f"📊 Loaded usage statistics for {usage_count} codes")
+        self._update_usage_watermark()
+    
+    def _update_usage_watermark(self):
+        """Remember the newest event date covered by the usage statistics"""
+        last_seen = [value for value in self._usage_columns.get('last_seen', ()) if value is not None]
+        self._usage_watermark = max(last_seen, default=None)
+    
+    def _apply_usage_delta(self, delta_rows: List[Dict[str, Any]]) -> int:
+        """
+        Replace the statistics of re-aggregated codes and re-rank
         
-        valuable_keywords = [
-            'fraud', 'bribery', 'corruption', 'conspiracy', 'tax', 'securities',
-            'regulatory', 'embezzle', 'extortion', 'insider'
-        ]
+        Delta rows cover each code's full history, so they supersede the
+        stored row outright; other codes keep their last-loaded values.
+        """
+        if not delta_rows:
+            return 0
         
-        investigative_keywords = [
-            'assault', 'battery', 'theft', 'burglary', 'forgery', 'cyber',
-            'identity', 'counterfeit', 'smuggling', 'fugitive'
+        stats = {code: self._usage_stats(code) for code in self._usage_index}
+        for row in delta_rows:
+            stats[row['code']] = {name: row.get(name) for name in USAGE_COLUMNS}
+        
+        # Same ranking as the full load's ROW_NUMBER() over total usage
+        codes = sorted(stats, key=lambda code: stats[code]['total_usage'], reverse=True)
+        for rank, code in enumerate(codes, 1):
+            stats[code]['frequency_rank'] = rank
+        self._store_usage(codes, {name: [stats[code][name] for code in codes] for name in USAGE_COLUMNS})
+        self._update_usage_watermark()
+        return len(delta_rows)
+    
+    def _store_usage(self, codes: List[str], columns: Dict[str, Any]):
+        """Keep usage statistics as parallel columns indexed by code"""
+        if NUMPY_AVAILABLE:
+            for name in USAGE_COUNT_COLUMNS:
+                columns[name] = np.asarray(columns[name], dtype=np.int64)
+        self._usage_index = {code: i for i, code in enumerate(codes)}
+        self._usage_columns = columns
+    
+    def _usage_stats(self, code: str) -> Dict[str, Any]:
+        """One code's usage statistics as plain Python values ({} if never used)"""
+        i = self._usage_index.get(code)
+        if i is None:
+            return {}
+        return {
+            name: int(column[i]) if name in USAGE_COUNT_COLUMNS else column[i]
+            for name, column in self._usage_columns.items()
+        }
+    
+    def _usage_base_scores(self):
+        """_base_score for every usage row, computed column-wise when NumPy is available"""
+        if not self._usage_index:
+            return []
+        rank = self._usage_columns['frequency_rank']
+        total = self._usage_columns['total_usage']
+        recent = self._usage_columns['recent_usage']
+        if NUMPY_AVAILABLE:
+            recency_boost = np.where(recent > 0, np.minimum(20, recent / np.maximum(1, total) * 100), 0)
+            return np.maximum(15, 90 - rank * 1.5) + recency_boost
+        return [_base_score(*values) for values in zip(rank, total, recent)]
+    
+    def _assign_intelligent_risk_scores(self):
+        """Assign intelligent risk scores based on database content and usage"""
+        codes = list(self.event_codes)
+        
+        # Content-based severity: bucketed by the warehouse at load time,
+        # matched here only for codes it did not classify
+        severities = [
+            self.severity_hints[code] if code in self.severity_hints
+            else self._match_severity(self.event_codes[code].get('description', '').lower())
+            for code in codes
         ]
+        severities = [severity if severity in SEVERITY_SCORING else 'probative' for severity in severities]
         
-        for code, code_data in self.event_codes.items():
-            # Get usage statistics
-            usage_stats = self.usage_statistics.get(code, {})
+        for code, severity, risk_score in zip(codes, severities, self._risk_scores(codes, severities)):
+            usage_stats = self._usage_stats(code)
             frequency_rank = usage_stats.get('frequency_rank', 999)
             total_usage = usage_stats.get('total_usage', 0)
             recent_usage = usage_stats.get('recent_usage', 0)
             
-            # Analyze description content
-            description = code_data.get('description', '').lower()
-            
-            # Base score calculation
-            # High frequency = lower base score (common events are often less critical individually)
-            base_score = max(15, 90 - (frequency_rank * 1.5))
-            
-            # Adjust for recent activity (recent = more relevant)
-            if recent_usage > 0:
-                recency_boost = min(20, recent_usage / max(1, total_usage) * 100)
-                base_score += recency_boost
-            
-            # Content-based severity and scoring
-            risk_score = base_score
-            severity = 'probative'
-            
-            if any(keyword in description for keyword in critical_keywords):
-                risk_score = max(85, base_score + 25)
-                severity = 'critical'
-            elif any(keyword in description for keyword in valuable_keywords):
-                risk_score = max(65, base_score + 15)
-                severity = 'valuable'
-            elif any(keyword in description for keyword in investigative_keywords):
-                risk_score = max(45, base_score + 10)
-                severity = 'investigative'
-            
-            # Ensure bounds
-            risk_score = min(100, max(10, int(risk_score)))
-            
             # Store risk scoring
-            code_data.update({
+            self.event_codes[code].update({
                 'risk_score': risk_score,
                 'severity': severity,
                 'auto_assigned': True,
                 'reasoning': f"Database analysis: rank {frequency_rank}, {total_usage:,} uses, recent {recent_usage}"
             })
     
+    def _risk_scores(self, codes: List[str], severities: List[str]) -> List[int]:
+        """Bounded risk score per code: usage-based base score lifted by its severity bucket"""
+        base_scores = self._usage_base_scores()
+        
+        if NUMPY_AVAILABLE:
+            # Row -1 (no usage) picks the appended unused-code base score
+            rows = np.fromiter((self._usage_index.get(code, -1) for code in codes), dtype=np.int64, count=len(codes))
+            base = np.append(base_scores, UNUSED_BASE_SCORE)[rows]
+            severity_array = np.array(severities, dtype=object)
+            risk = np.select(
+                [severity_array == severity for severity, _, _, _ in SEVERITY_BUCKETS],
+                [np.maximum(floor, base + boost) for _, _, floor, boost in SEVERITY_BUCKETS],
+                default=base
+            )
+            # Ensure bounds
+            return np.clip(risk.astype(np.int64), 10, 100).tolist()
+        
+        risk_scores = []
+        for code, severity in zip(codes, severities):
+            i = self._usage_index.get(code)
+            risk_score = UNUSED_BASE_SCORE if i is None else base_scores[i]
+            if severity in SEVERITY_SCORING:
+                floor, boost = SEVERITY_SCORING[severity]
+                risk_score = max(floor, risk_score + boost)
+            # Ensure bounds
+            risk_scores.append(min(100, max(10, int(risk_score))))
+        return risk_scores
+    
+    @staticmethod
+    def _match_severity(description: str) -> Optional[str]:
+        """First severity bucket with a keyword in the (lowercased) description"""
+        for severity, pattern in SEVERITY_PATTERNS:
+            if pattern.search(description):
+                return severity
+        return None
+    
     def _load_fallback_codes(self):
         """Load minimal fallback codes if database is unavailable"""
-        fallback = {
-            'TER': {'name': 'Terrorism', 'risk_score': 100, 'severity': 'critical'},
-            'DTF': {'name': 'Drug Trafficking', 'risk_score': 90, 'severity': 'critical'},
-            'MLA': {'name': 'Money Laundering', 'risk_score': 85, 'severity': 'critical'},
-            'FRD': {'name': 'Fraud', 'risk_score': 70, 'severity': 'valuable'},
-            'BRB': {'name': 'Bribery', 'risk_score': 75, 'severity': 'valuable'},
-        }
-        
-        for code, data in fallback.items():
+        for code, name, risk_score, severity in FALLBACK_CODES:
             self.event_codes[code] = {
-                **data,
-                'description': data['name'],
+                'name': name,
+                'risk_score': risk_score,
+                'severity': severity,
+                'description': name,
                 'source': 'fallback',
                 'auto_assigned': True
             }
@@ -279,10 +580,13 @@ class DatabaseDrivenCodes:
     def _load_user_customizations(self):
         """Load user customizations"""
         try:
-            config_file = "/Users/sujanmukhiya/Desktop/NiceGUI_GRID/advanced_entity_search/user_event_config.json"
-            
-            with open(config_file, 'r', encoding='utf-8') as f:
-                self.user_customizations = json.load(f)
+            # Unchanged file: reuse the parsed customizations, but still apply
+            # them, since a reload replaces the code entries
+            mtime = self._config_path.stat().st_mtime
+            if mtime != self._config_mtime:
+                data = self._config_path.read_bytes()
+                self.user_customizations = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+                self._config_mtime = mtime
             
             # Apply customizations
             for code, custom_config in self.user_customizations.items():
@@ -290,6 +594,7 @@ class DatabaseDrivenCodes:
                     self.event_codes[code].update(custom_config)
                     self.event_codes[code]['auto_assigned'] = False
                     self.event_codes[code]['user_customized'] = True
+            self._rebuild_code_view()
             
             logger.info(f"✅ Applied user customizations for {len(self.user_customizations)} codes")
             
@@ -301,26 +606,65 @@ class DatabaseDrivenCodes:
     def save_user_customizations(self):
         """Save user customizations"""
         try:
-            config_file = "/Users/sujanmukhiya/Desktop/NiceGUI_GRID/advanced_entity_search/user_event_config.json"
-            
             # Extract user-customized codes
-            user_configs = {
-                code: {k: v for k, v in config.items() 
-                      if k in ['risk_score', 'severity', 'name', 'description', 'user_customized']}
-                for code, config in self.event_codes.items()
-                if config.get('user_customized', False)
-            }
+            user_configs = {}
+            for code, config in self.event_codes.items():
+                if config.get('user_customized', False):
+                    user_configs[code] = {field: config[field] for field in CUSTOMIZED_FIELDS if field in config}
             
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(user_configs, f, indent=2, ensure_ascii=False)
+            if ORJSON_AVAILABLE:
+                data = orjson.dumps(user_configs, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                data = json.dumps(user_configs, indent=2, ensure_ascii=False).encode('utf-8')
+            self._config_path.write_bytes(data)
             
             logger.info(f"✅ Saved user customizations for {len(user_configs)} codes")
             
         except Exception as e:
             logger.error(f"❌ Error saving user customizations: {e}")
     
+    def _rebuild_code_view(self):
+        """Materialize get_code_info's result for every known code"""
+        self._code_view = {code: self._build_code_info(code) for code in self.event_codes}
+        self._names = {code: info['name'] for code, info in self._code_view.items()}
+        self._description_lut = {}
+    
+    def get_event_name(self, code: str) -> Optional[str]:
+        """Display name of a known event code, None for unknown codes"""
+        return self._names.get(code)
+    
+    def get_event_description(self, event_code: str, sub_code: str = None) -> str:
+        """Get event description for display"""
+        key = (event_code, sub_code)
+        description = self._description_lut.get(key)
+        if description is None:
+            description = self._description_lut[key] = self._render_event_description(event_code, sub_code)
+        return description
+    
+    def _render_event_description(self, event_code: str, sub_code: str = None) -> str:
+        """Build get_event_description's text for one (event_code, sub_code) pair"""
+        name = self._names.get(event_code)
+        
+        # Only return "Unknown" if the code truly doesn't exist in the database
+        # For codes in database, always return the proper name
+        if name is None or name.startswith('Unknown Code'):
+            return event_code  # Just return the code itself, not "Unknown (code)"
+        
+        if sub_code:
+            sub_info = self.sub_category_codes.get(sub_code)
+            return f"{name} - {sub_info['name'] if sub_info else sub_code}"
+        
+        return name
+    
     def get_code_info(self, code: str) -> Dict[str, Any]:
-        """Get comprehensive information about an event code"""
+        """Get comprehensive information about an event code (shared; do not mutate)"""
+        info = self._code_view.get(code)
+        if info is None:
+            info = self._build_code_info(code)
+        return info
+    
+    def _build_code_info(self, code: str) -> Dict[str, Any]:
+        """Merge a code's configuration with its usage statistics"""
         if code not in self.event_codes:
             return {
                 'code': code,
@@ -331,8 +675,8 @@ class DatabaseDrivenCodes:
                 'source': 'missing'
             }
         
-        code_data = self.event_codes[code].copy()
-        usage_stats = self.usage_statistics.get(code, {})
+        code_data = self.event_codes[code]
+        usage_stats = self._usage_stats(code)
         
         return {
             'code': code,
@@ -369,52 +713,65 @@ class DatabaseDrivenCodes:
         # Mark as user customized
         self.event_codes[code]['user_customized'] = True
         self.event_codes[code]['auto_assigned'] = False
+        self._code_view[code] = self._build_code_info(code)
+        self._names[code] = self._code_view[code]['name']
+        self._description_lut = {}
         
         logger.info(f"✅ Updated configuration for code {code}")
     
     def get_all_codes_summary(self) -> List[Dict[str, Any]]:
-        """Get summary of all codes"""
-        summary = []
-        
-        for code in sorted(self.event_codes.keys()):
-            info = self.get_code_info(code)
-            summary.append(info)
-        
-        return summary
+        """Get summary of all codes, sorted by code (rows are shared; do not mutate)"""
+        code_view = self._code_view
+        return [code_view[code] for code in sorted(code_view)]
     
-    def refresh_from_database(self):
-        """Refresh codes from database (for live updates)"""
+    def refresh_from_database(self, incremental: bool = False):
+        """
+        Refresh codes from database (for live updates)
+        
+        Re-runs the full load by default. incremental=True re-aggregates only
+        codes with events dated on or after the newest loaded event date; it
+        is cheaper, but back-dated events for other codes wait for a full load.
+        """
         logger.info("🔄 Refreshing codes from database...")
-        self._load_all_codes_from_database()
+        if not incremental or self._usage_watermark is None:
+            self._load_all_codes_from_database()
+        else:
+            try:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                    dictionary = executor.submit(self._load_code_dictionary)
+                    delta = executor.submit(self._execute_query, self._usage_query(incremental=True),
+                                            {'since': self._usage_watermark})
+                dictionary.result()
+                merged = self._apply_usage_delta(delta.result())
+                logger.info(f"📊 Re-aggregated usage for {merged} codes")
+                self._assign_intelligent_risk_scores()
+            except Exception as e:
+                logger.error(f"❌ Error refreshing usage statistics: {e}")
+            self._rebuild_code_view()
         self._load_user_customizations()
         logger.info("✅ Database refresh completed")
 
-# Global instance
-database_driven_codes = DatabaseDrivenCodes()
+@functools.lru_cache(maxsize=1)
+def get_codes() -> DatabaseDrivenCodes:
+    """Shared instance, connected and loaded on first use rather than at import"""
+    return DatabaseDrivenCodes()
+
+def __getattr__(name: str):
+    # Keeps `from database_driven_codes import database_driven_codes` working
+    if name == 'database_driven_codes':
+        return get_codes()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_event_description(event_code: str, sub_code: str = None) -> str:
     """Get event description for display"""
-    info = database_driven_codes.get_code_info(event_code)
-    
-    # Only return "Unknown" if the code truly doesn't exist in the database
-    # For codes in database, always return the proper name
-    if info['source'] == 'missing' or info['name'].startswith('Unknown Code'):
-        return event_code  # Just return the code itself, not "Unknown (code)"
-    
-    if sub_code and sub_code in database_driven_codes.sub_category_codes:
-        sub_info = database_driven_codes.sub_category_codes[sub_code]
-        return f"{info['name']} - {sub_info['name']}"
-    elif sub_code:
-        return f"{info['name']} - {sub_code}"
-    
-    return info['name']
+    return get_codes().get_event_description(event_code, sub_code)
 
 def get_event_risk_score(event_code: str) -> int:
     """Get risk score for an event code"""
-    info = database_driven_codes.get_code_info(event_code)
+    info = get_codes().get_code_info(event_code)
     return info['risk_score']
 
 def get_event_severity(event_code: str) -> str:
     """Get severity level for an event code"""
-    info = database_driven_codes.get_code_info(event_code)
+    info = get_codes().get_code_info(event_code)
     return info['severity']
\ No newline at end of file
@@ -4,10 +4,22 @@ Uses ONLY actual codes from database queries - NO mix and match
 """
 import json
 import os
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 class DatabaseVerifiedConfigManager:
     """Configuration manager using ONLY database-verified codes"""
     
@@ -22,14 +34,39 @@ class DatabaseVerifiedConfigManager:
         
         if config_path.exists():
             try:
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
+                config = self._load_snapshot(config_path)
+                if config is None:
+                    if ORJSON_AVAILABLE:
+                        config = orjson.loads(config_path.read_bytes())
+                    else:
+                        with open(config_path, 'r') as f:
+                            config = json.load(f)
                 return self._merge_with_defaults(config)
             except Exception as e:
                 print(f"Warning: Could not load config file {self.config_file}: {e}")
         
         return self._get_database_verified_defaults()
     
+    def _snapshot_path(self) -> Path:
+        """Binary msgpack copy of the config file, written alongside it on save"""
+        return Path(self.config_file + '.mp')
+    
+    def _load_snapshot(self, config_path: Path) -> Optional[Dict[str, Any]]:
+        """Load the msgpack snapshot if it is at least as new as the JSON file"""
+        if not MSGPACK_AVAILABLE:
+            return None
+        snapshot_path = self._snapshot_path()
+        try:
+            # A hand-edited JSON file is newer than its snapshot and wins
+            if snapshot_path.stat().st_mtime < config_path.stat().st_mtime:
+                return None
+            return msgpack.unpackb(snapshot_path.read_bytes(), raw=False)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Warning: Ignoring config snapshot {snapshot_path}: {e}")
+            return None
+    
     def _merge_with_defaults(self, user_config: Dict) -> Dict:
         """Merge user config with database-verified defaults"""
         defaults = self._get_database_verified_defaults()
@@ -308,7 +345,10 @@ class DatabaseVerifiedConfigManager:
     
     def set(self, key: str, value: Any) -> None:
         """Set configuration value using dot notation"""
-        keys = key.split('.')
+        self.set_path(key.split('.'), value)
+    
+    def set_path(self, keys: Sequence[str], value: Any) -> None:
+        """Set configuration value at an already-split key path"""
         config = self.config
         
         for k in keys[:-1]:
@@ -322,8 +362,15 @@ class DatabaseVerifiedConfigManager:
     def save_config(self) -> None:
         """Save current configuration to file"""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            if ORJSON_AVAILABLE:
+                with open(self.config_file, 'wb') as f:
+                    f.write(orjson.dumps(self.config, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.config_file, 'w') as f:
+                    json.dump(self.config, f, indent=2)
+            if MSGPACK_AVAILABLE:
+                # Written after the JSON so its mtime marks it as current
+                self._snapshot_path().write_bytes(msgpack.packb(self.config, use_bin_type=True))
         except Exception as e:
             print(f"Error saving config: {e}")
     